@@ -1,15 +1,14 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 
 from app.models.requests import CompileRequest
-from app.services.compiler import TransformCompiler
-from app.services.project_manager import ProjectManager
+from app.services.compiler import compile_table_cached
+from app.services.project_manager import ProjectManager, get_project_manager
 
 router = APIRouter()
 
 
-def _load(req: CompileRequest) -> tuple[dict, dict]:
+def _load(req: CompileRequest, pm: ProjectManager) -> tuple[dict, dict]:
     """Return (table_spec, project_config), raising 404 on missing data."""
-    pm = ProjectManager()
     try:
         table_spec = pm.get_table_spec(req.project_name, req.layer, req.table_name)
         project_config = pm.get_project(req.project_name)
@@ -19,29 +18,32 @@ def _load(req: CompileRequest) -> tuple[dict, dict]:
 
 
 @router.post("/sql")
-async def compile_sql(req: CompileRequest):
-    table_spec, project_config = _load(req)
-    return TransformCompiler().compile_table_sql(table_spec, req.dialect, project_config)
+def compile_sql(
+    req: CompileRequest, pm: ProjectManager = Depends(get_project_manager)
+):
+    table_spec, project_config = _load(req, pm)
+    return compile_table_cached("sql", table_spec, req.dialect, project_config)
 
 
 @router.post("/pyspark")
-async def compile_pyspark(req: CompileRequest):
-    table_spec, project_config = _load(req)
-    return TransformCompiler().compile_table_pyspark(table_spec, project_config)
+def compile_pyspark(
+    req: CompileRequest, pm: ProjectManager = Depends(get_project_manager)
+):
+    table_spec, project_config = _load(req, pm)
+    return compile_table_cached("pyspark", table_spec, req.dialect, project_config)
 
 
 @router.post("/dbt")
-async def compile_dbt(req: CompileRequest):
-    table_spec, project_config = _load(req)
-    return TransformCompiler().compile_table_dbt(table_spec, req.dialect, project_config)
+def compile_dbt(
+    req: CompileRequest, pm: ProjectManager = Depends(get_project_manager)
+):
+    table_spec, project_config = _load(req, pm)
+    return compile_table_cached("dbt", table_spec, req.dialect, project_config)
 
 
 @router.post("/all")
-async def compile_all(req: CompileRequest):
-    table_spec, project_config = _load(req)
-    compiler = TransformCompiler()
-    return {
-        "sql":     compiler.compile_table_sql(table_spec, req.dialect, project_config),
-        "pyspark": compiler.compile_table_pyspark(table_spec, project_config),
-        "dbt":     compiler.compile_table_dbt(table_spec, req.dialect, project_config),
-    }
+def compile_all(
+    req: CompileRequest, pm: ProjectManager = Depends(get_project_manager)
+):
+    table_spec, project_config = _load(req, pm)
+    return compile_table_cached("all", table_spec, req.dialect, project_config)
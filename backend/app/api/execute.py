@@ -1,9 +1,9 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 
 from app.models.requests import ExecuteRequest
-from app.services.executor import DuckDBExecutor
-from app.services.project_manager import ProjectManager
+from app.services.executor import DuckDBExecutor, get_executor
+from app.services.project_manager import ProjectManager, get_project_manager
 
 router = APIRouter()
 
@@ -16,21 +16,26 @@ class ValidateRequest(BaseModel):
 
 
 @router.post("/sql")
-async def execute_sql(req: ExecuteRequest):
-    return DuckDBExecutor().execute_sql(req.query, req.data, req.table_name)
+def execute_sql(
+    req: ExecuteRequest, executor: DuckDBExecutor = Depends(get_executor)
+):
+    return executor.execute_sql(req.query, req.data, req.table_name)
 
 
 @router.post("/validate")
-async def validate(req: ValidateRequest):
-    pm = ProjectManager()
+def validate(
+    req: ValidateRequest,
+    pm: ProjectManager = Depends(get_project_manager),
+    executor: DuckDBExecutor = Depends(get_executor),
+):
     try:
-        synthetic = pm.get_synthetic_data(req.project_name, req.layer, req.table_name)
+        synthetic = pm.get_synthetic_file(
+            req.project_name, req.layer, req.table_name
+        ) or pm.get_synthetic_table(req.project_name, req.layer, req.table_name)
         table_spec = pm.get_table_spec(req.project_name, req.layer, req.table_name)
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
-    report = DuckDBExecutor().validate_table(
-        table_spec, req.compiled_sql, synthetic["data"]
-    )
+    report = executor.validate_table(table_spec, req.compiled_sql, synthetic)
     pm.save_validation_results(req.project_name, req.layer, req.table_name, report)
     return report
@@ -1,24 +1,27 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 
 from app.models.requests import GenerateDataRequest
+from app.services.llm.base import BaseLLMProvider, ProviderUnavailableError
 from app.services.llm.factory import get_llm_provider
-from app.services.project_manager import ProjectManager
+from app.services.project_manager import ProjectManager, get_project_manager
 
 router = APIRouter()
 
 
 @router.get("/status")
-async def llm_status():
-    provider = get_llm_provider()
+def llm_status(provider: BaseLLMProvider = Depends(get_llm_provider)):
     info = provider.get_provider_info()
     return {**info, "available": provider.is_available()}
 
 
 @router.post("/generate-data")
-async def generate_data(req: GenerateDataRequest):
-    pm = ProjectManager()
+def generate_data(
+    req: GenerateDataRequest,
+    pm: ProjectManager = Depends(get_project_manager),
+    provider: BaseLLMProvider = Depends(get_llm_provider),
+):
     try:
         spec = pm.get_table_spec(req.project_name, req.layer, req.table_name)
     except FileNotFoundError as e:
@@ -26,17 +29,21 @@ async def generate_data(req: GenerateDataRequest):
 
     schema: list[dict] = spec["columns"]
     notes: dict = spec["notes"]
-    column_names = {col["name"] for col in schema}
+    column_names = frozenset(col["name"] for col in schema)
 
-    provider = get_llm_provider()
     try:
-        rows = provider.generate_synthetic_data(schema, notes, req.row_count)
+        rows = provider.generate_rows(schema, notes, req.row_count)
+    except ProviderUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
     # Validate every row has all column keys; collect missing as warnings
     warnings: list[str] = []
+    expected = len(column_names)
     for i, row in enumerate(rows):
+        if len(row) == expected and column_names.issubset(row):
+            continue
         missing = column_names - row.keys()
         if missing:
             warnings.append(
@@ -1,47 +1,54 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 
 from app.models.requests import CreateProjectRequest, CreateTableRequest
-from app.services.project_manager import ProjectManager
+from app.services.project_manager import ProjectManager, get_project_manager
 
 router = APIRouter()
 
 
-def _pm() -> ProjectManager:
-    return ProjectManager()
-
-
 @router.post("/", status_code=201)
-async def create_project(req: CreateProjectRequest):
+def create_project(
+    req: CreateProjectRequest,
+    pm: ProjectManager = Depends(get_project_manager),
+):
     try:
-        return _pm().create_project(req)
+        return pm.create_project(req)
     except ValueError as e:
         raise HTTPException(status_code=409, detail=str(e))
 
 
 @router.get("/")
-async def list_projects():
-    return _pm().list_projects()
+def list_projects(pm: ProjectManager = Depends(get_project_manager)):
+    return pm.list_projects()
 
 
 @router.get("/{project_name}")
-async def get_project(project_name: str):
+def get_project(
+    project_name: str, pm: ProjectManager = Depends(get_project_manager)
+):
     try:
-        return _pm().get_project(project_name)
+        return pm.get_project(project_name)
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
 
 @router.get("/{project_name}/tables")
-async def list_tables(project_name: str):
+def list_tables(
+    project_name: str, pm: ProjectManager = Depends(get_project_manager)
+):
     try:
-        return _pm().list_tables(project_name)
+        return pm.list_tables(project_name)
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
 
 @router.post("/{project_name}/tables", status_code=201)
-async def create_table(project_name: str, req: CreateTableRequest):
+def create_table(
+    project_name: str,
+    req: CreateTableRequest,
+    pm: ProjectManager = Depends(get_project_manager),
+):
     try:
-        return _pm().create_table(project_name, req)
+        return pm.create_table(project_name, req)
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
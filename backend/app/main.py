@@ -5,6 +5,7 @@ import os
 from contextlib import asynccontextmanager
 
 import duckdb
+import orjson
 from dotenv import load_dotenv
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
@@ -18,6 +19,15 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+class ORJSONResponse(JSONResponse):
+    """Default response class: serializes with orjson instead of stdlib json."""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(
+            content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     llm_provider = os.getenv("LLM_PROVIDER", "phi3")
@@ -28,7 +38,12 @@ async def lifespan(app: FastAPI):
     yield
 
 
-app = FastAPI(title="DataForge Studio", version="0.1.0", lifespan=lifespan)
+app = FastAPI(
+    title="DataForge Studio",
+    version="0.1.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Literal
 
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 
 
 class RegexTransform(BaseModel):
@@ -49,6 +49,21 @@ class ColumnTransformations(BaseModel):
     delimiter_split: DelimiterSplit = DelimiterSplit()
     custom_expression: str = ""
 
+    def is_identity(self) -> bool:
+        """True when no transformation is active and the column passes through."""
+        return not (
+            self.trim
+            or self.strip_special_chars
+            or self.regex.enabled
+            or self.case_normalization != "none"
+            or self.type_cast
+            or self.null_strategy != "none"
+            or self.where_filter.enabled
+            or (self.conditional.enabled and self.conditional.cases)
+            or self.delimiter_split.enabled
+            or self.custom_expression
+        )
+
 
 class Column(BaseModel):
     name: str
@@ -59,6 +74,11 @@ class Column(BaseModel):
     transformations: ColumnTransformations = ColumnTransformations()
 
 
+# Built once at import; validates and serializes whole column lists in
+# pydantic-core instead of one model_dump per column.
+COLUMNS_ADAPTER = TypeAdapter(list[Column])
+
+
 class TableSpec(BaseModel):
     name: str
     layer: Literal["bronze", "silver", "gold"]
@@ -1,8 +1,13 @@
 from __future__ import annotations
 
 import textwrap
+from functools import lru_cache
+from string import Formatter
+from typing import Callable, NamedTuple
 
-from app.models.spec import Column
+import orjson
+
+from app.models.spec import COLUMNS_ADAPTER, Column, ColumnTransformations
 from app.services.templates import TEMPLATES, TRANSFORM_ORDER
 
 # Literal string used in templates to signal unsupported operations
@@ -12,12 +17,191 @@ _WARNING_PREFIX = "__WARNING__:"
 _PYSPARK_COL_PATTERN = "F.col('{col}')"
 
 
+def _compile_format(tmpl: str) -> Callable[..., str]:
+    """Pre-parse a str.format template into a render(**values) closure."""
+    chunks: list[tuple[str, str | None]] = []
+    for literal, field, spec, conversion in Formatter().parse(tmpl):
+        if spec or conversion or (field is not None and not field.isidentifier()):
+            return tmpl.format
+        chunks.append((literal, field))
+
+    def render(**values) -> str:
+        return "".join([
+            literal if field is None else literal + str(values[field])
+            for literal, field in chunks
+        ])
+
+    return render
+
+
+class _CompiledTemplate(NamedTuple):
+    # Set for unsupported operations, which have nothing to render
+    warning: str = ""
+    render: Callable[..., str] | None = None
+    # PySpark only: F.col('{col}') swapped for {col} so it can wrap an expr
+    render_chain: Callable[..., str] | None = None
+
+
+def _compile_templates() -> dict[tuple[str, str], _CompiledTemplate]:
+    compiled: dict[tuple[str, str], _CompiledTemplate] = {}
+    for key, by_dialect in TEMPLATES.items():
+        for dialect, tmpl in by_dialect.items():
+            if not tmpl:
+                continue
+            if tmpl.startswith(_WARNING_PREFIX):
+                warning = tmpl[len(_WARNING_PREFIX):].lstrip()
+                compiled[key, dialect] = _CompiledTemplate(warning)
+                continue
+            render = _compile_format(tmpl)
+            chain = tmpl.replace(_PYSPARK_COL_PATTERN, "{col}")
+            render_chain = render if chain == tmpl else _compile_format(chain)
+            compiled[key, dialect] = _CompiledTemplate(
+                render=render, render_chain=render_chain
+            )
+    return compiled
+
+
+_COMPILED_TEMPLATES = _compile_templates()
+
+
+def _parse_columns(table_spec: dict) -> list[Column]:
+    return COLUMNS_ADAPTER.validate_python(table_spec["columns"])
+
+
+# ------------------------------------------------------------ step handlers
+
+# One handler per TRANSFORM_ORDER step. Each checks its own flags and calls
+# apply(template_key, extra) when the step is active.
+
+_Apply = Callable[..., None]
+
+
+def _step_trim(t: ColumnTransformations, apply: _Apply) -> None:
+    if t.trim:
+        apply("trim")
+
+
+def _step_strip_special(t: ColumnTransformations, apply: _Apply) -> None:
+    if t.strip_special_chars:
+        apply("strip_special")
+
+
+def _step_regex(t: ColumnTransformations, apply: _Apply) -> None:
+    if t.regex.enabled:
+        apply(
+            "regex_replace",
+            {"pattern": t.regex.pattern, "repl": t.regex.replacement},
+        )
+
+
+def _step_case_normalization(t: ColumnTransformations, apply: _Apply) -> None:
+    if t.case_normalization != "none":
+        apply(f"case_{t.case_normalization}")
+
+
+def _step_type_cast(t: ColumnTransformations, apply: _Apply) -> None:
+    if t.type_cast:
+        apply(
+            f"cast_{t.type_cast}",
+            {"type": t.type_cast, "format": "YYYY-MM-DD"},
+        )
+
+
+def _step_null_strategy(t: ColumnTransformations, apply: _Apply) -> None:
+    if t.null_strategy == "replace":
+        apply("null_replace", {"replacement": t.null_replacement})
+    elif t.null_strategy == "drop":
+        apply("null_drop")
+    elif t.null_strategy == "flag":
+        apply("null_flag")
+
+
+def _step_where_filter(t: ColumnTransformations, apply: _Apply) -> None:
+    if t.where_filter.enabled:
+        apply("where_filter", {"condition": t.where_filter.condition})
+
+
+def _step_conditional(t: ColumnTransformations, apply: _Apply) -> None:
+    if t.conditional.enabled and t.conditional.cases:
+        cases_str = " ".join(
+            f"WHEN {c.when} THEN '{c.then}'"
+            for c in t.conditional.cases
+        )
+        apply(
+            "conditional_case",
+            {
+                "cases": cases_str,
+                "else_value": t.conditional.else_value,
+            },
+        )
+
+
+def _step_delimiter_split(t: ColumnTransformations, apply: _Apply) -> None:
+    if t.delimiter_split.enabled:
+        apply(
+            "delimiter_split",
+            {
+                "delimiter": t.delimiter_split.delimiter,
+                "index": t.delimiter_split.index,
+            },
+        )
+
+
+_STEP_HANDLERS: dict[str, Callable[[ColumnTransformations, _Apply], None]] = {
+    "trim": _step_trim,
+    "strip_special": _step_strip_special,
+    "regex": _step_regex,
+    "case_normalization": _step_case_normalization,
+    "type_cast": _step_type_cast,
+    "null_strategy": _step_null_strategy,
+    "where_filter": _step_where_filter,
+    "conditional": _step_conditional,
+    "delimiter_split": _step_delimiter_split,
+}
+
+
+def _plan(t: ColumnTransformations) -> list[tuple[str, dict]]:
+    """The active (template_key, extra) steps, in TRANSFORM_ORDER.
+
+    The plan does not depend on the target, so one plan can be rendered for
+    SQL and PySpark alike.
+    """
+    steps: list[tuple[str, dict]] = []
+
+    def apply(template_key: str, extra: dict | None = None) -> None:
+        steps.append((template_key, extra or {}))
+
+    for step in TRANSFORM_ORDER:
+        _STEP_HANDLERS[step](t, apply)
+    return steps
+
+
+_SELECT_LINE = "{expression} AS {alias}".format
+_WITH_COLUMN_LINE = ".withColumn('{alias}', {expression})".format
+
+
+def _lines_and_warnings(
+    col_results: list[dict], line: Callable[..., str]
+) -> tuple[list[str], list[str]]:
+    """Format one output line per column and gather warnings in one pass."""
+    lines: list[str] = []
+    warnings: list[str] = []
+    for r in col_results:
+        lines.append(line(expression=r["expression"], alias=r["alias"]))
+        warnings.extend(r["warnings"])
+    return lines, warnings
+
+
 class TransformCompiler:
 
     # --------------------------------------------------------- column level
 
     def compile_column(
-        self, column: Column, target: str, dialect: str
+        self,
+        column: Column,
+        target: str,
+        dialect: str,
+        steps: list[tuple[str, dict]] | None = None,
     ) -> dict:
         t = column.transformations
         warnings: list[str] = []
@@ -33,102 +217,47 @@ class TransformCompiler:
                 "dialect": dialect,
             }
 
-        tgt_dialect = "pyspark" if target == "pyspark" else dialect
-
         # Initial expression: raw column reference
         expr: str = (
             f"F.col('{column.name}')" if target == "pyspark" else column.name
         )
+
+        # Pass-through column: nothing to apply
+        if t.is_identity():
+            return {
+                "column_name": column.name,
+                "expression": expr,
+                "alias": column.name,
+                "warnings": [],
+                "target": target,
+                "dialect": dialect,
+            }
+
+        if steps is None:
+            steps = _plan(t)
+        tgt_dialect = "pyspark" if target == "pyspark" else dialect
         # Tracks whether any PySpark template has been applied yet
         pyspark_applied = False
 
-        def _apply(template_key: str, extra: dict | None = None) -> None:
-            nonlocal expr, pyspark_applied
-            extra = extra or {}
-            tmpl = TEMPLATES.get(template_key, {}).get(tgt_dialect, "")
-            if not tmpl:
-                return
-            if tmpl.startswith(_WARNING_PREFIX):
-                warnings.append(tmpl[len(_WARNING_PREFIX):].lstrip())
-                return  # skip — do not modify expr
+        for template_key, extra in steps:
+            tmpl = _COMPILED_TEMPLATES.get((template_key, tgt_dialect))
+            if tmpl is None:
+                continue
+            if tmpl.warning:
+                warnings.append(tmpl.warning)
+                continue  # skip — do not modify expr
 
             if target == "pyspark":
                 if not pyspark_applied:
                     # First PySpark template: {col} = bare column name
-                    filled = tmpl.format(col=column.name, **extra)
+                    expr = tmpl.render(col=column.name, **extra)
                     pyspark_applied = True
                 else:
-                    # Subsequent: replace F.col('{col}') with accumulated expr,
-                    # then format remaining placeholders using col=expr
-                    chain = tmpl.replace(_PYSPARK_COL_PATTERN, "{col}")
-                    filled = chain.format(col=expr, **extra)
+                    # Subsequent: F.col('{col}') was pre-replaced with {col},
+                    # so the accumulated expr is substituted as col=expr
+                    expr = tmpl.render_chain(col=expr, **extra)
             else:
-                filled = tmpl.format(col=expr, **extra)
-
-            expr = filled
-
-        for step in TRANSFORM_ORDER:
-            if step == "trim":
-                if t.trim:
-                    _apply("trim")
-
-            elif step == "strip_special":
-                if t.strip_special_chars:
-                    _apply("strip_special")
-
-            elif step == "regex":
-                if t.regex.enabled:
-                    _apply(
-                        "regex_replace",
-                        {"pattern": t.regex.pattern, "repl": t.regex.replacement},
-                    )
-
-            elif step == "case_normalization":
-                if t.case_normalization != "none":
-                    _apply(f"case_{t.case_normalization}")
-
-            elif step == "type_cast":
-                if t.type_cast:
-                    _apply(
-                        f"cast_{t.type_cast}",
-                        {"type": t.type_cast, "format": "YYYY-MM-DD"},
-                    )
-
-            elif step == "null_strategy":
-                if t.null_strategy == "replace":
-                    _apply("null_replace", {"replacement": t.null_replacement})
-                elif t.null_strategy == "drop":
-                    _apply("null_drop")
-                elif t.null_strategy == "flag":
-                    _apply("null_flag")
-
-            elif step == "where_filter":
-                if t.where_filter.enabled:
-                    _apply("where_filter", {"condition": t.where_filter.condition})
-
-            elif step == "conditional":
-                if t.conditional.enabled and t.conditional.cases:
-                    cases_str = " ".join(
-                        f"WHEN {c.when} THEN '{c.then}'"
-                        for c in t.conditional.cases
-                    )
-                    _apply(
-                        "conditional_case",
-                        {
-                            "cases": cases_str,
-                            "else_value": t.conditional.else_value,
-                        },
-                    )
-
-            elif step == "delimiter_split":
-                if t.delimiter_split.enabled:
-                    _apply(
-                        "delimiter_split",
-                        {
-                            "delimiter": t.delimiter_split.delimiter,
-                            "index": t.delimiter_split.index,
-                        },
-                    )
+                expr = tmpl.render(col=expr, **extra)
 
         return {
             "column_name": column.name,
@@ -141,8 +270,17 @@ class TransformCompiler:
 
     # ---------------------------------------------------------- table level
 
+    def _compile_columns(
+        self, columns: list[Column], target: str, dialect: str
+    ) -> list[dict]:
+        return [self.compile_column(col, target, dialect) for col in columns]
+
     def compile_table_sql(
-        self, table_spec: dict, dialect: str, project_config: dict
+        self,
+        table_spec: dict,
+        dialect: str,
+        project_config: dict,
+        col_results: list[dict] | None = None,
     ) -> dict:
         table_name = table_spec["table"]["name"]
         layer = table_spec["table"]["layer"]
@@ -153,16 +291,13 @@ class TransformCompiler:
             else f"{layer}.{table_name}"
         )
 
-        col_results = [
-            self.compile_column(Column.model_validate(c), "sql", dialect)
-            for c in table_spec["columns"]
-        ]
-
-        all_warnings = [w for r in col_results for w in r["warnings"]]
+        if col_results is None:
+            col_results = self._compile_columns(
+                _parse_columns(table_spec), "sql", dialect
+            )
 
-        select_lines = ",\n        ".join(
-            f"{r['expression']} AS {r['alias']}" for r in col_results
-        )
+        lines, all_warnings = _lines_and_warnings(col_results, _SELECT_LINE)
+        select_lines = ",\n        ".join(lines)
 
         sql = (
             f"WITH cleaned AS (\n"
@@ -181,21 +316,20 @@ class TransformCompiler:
         }
 
     def compile_table_pyspark(
-        self, table_spec: dict, project_config: dict
+        self,
+        table_spec: dict,
+        project_config: dict,
+        col_results: list[dict] | None = None,
     ) -> dict:
         table_name = table_spec["table"]["name"]
 
-        col_results = [
-            self.compile_column(Column.model_validate(c), "pyspark", "pyspark")
-            for c in table_spec["columns"]
-        ]
-
-        all_warnings = [w for r in col_results for w in r["warnings"]]
+        if col_results is None:
+            col_results = self._compile_columns(
+                _parse_columns(table_spec), "pyspark", "pyspark"
+            )
 
-        with_cols = "\n            ".join(
-            f".withColumn('{r['alias']}', {r['expression']})"
-            for r in col_results
-        )
+        lines, all_warnings = _lines_and_warnings(col_results, _WITH_COLUMN_LINE)
+        with_cols = "\n            ".join(lines)
 
         code = textwrap.dedent(f"""\
             from pyspark.sql import DataFrame
@@ -218,22 +352,24 @@ class TransformCompiler:
         }
 
     def compile_table_dbt(
-        self, table_spec: dict, dialect: str, project_config: dict
+        self,
+        table_spec: dict,
+        dialect: str,
+        project_config: dict,
+        col_results: list[dict] | None = None,
+        columns: list[Column] | None = None,
     ) -> dict:
         table_name = table_spec["table"]["name"]
         layer = table_spec["table"]["layer"]
         notes: dict = table_spec.get("notes", {})
 
-        col_results = [
-            self.compile_column(Column.model_validate(c), "sql", dialect)
-            for c in table_spec["columns"]
-        ]
-
-        all_warnings = [w for r in col_results for w in r["warnings"]]
+        if columns is None:
+            columns = _parse_columns(table_spec)
+        if col_results is None:
+            col_results = self._compile_columns(columns, "sql", dialect)
 
-        select_lines = ",\n    ".join(
-            f"{r['expression']} AS {r['alias']}" for r in col_results
-        )
+        lines, all_warnings = _lines_and_warnings(col_results, _SELECT_LINE)
+        select_lines = ",\n    ".join(lines)
 
         model_sql = (
             f"WITH source AS (\n"
@@ -247,7 +383,7 @@ class TransformCompiler:
             f"SELECT * FROM cleaned"
         )
 
-        schema_yml = self._build_schema_yml(table_name, table_spec["columns"], notes)
+        schema_yml = self._build_schema_yml(table_name, columns, notes)
 
         return {
             "model_sql": model_sql,
@@ -255,11 +391,54 @@ class TransformCompiler:
             "warnings": all_warnings,
         }
 
+    def compile_table_all(
+        self, table_spec: dict, dialect: str, project_config: dict
+    ) -> dict:
+        """SQL, PySpark and dbt output from a single pass over the columns.
+
+        Each column's transformation plan is built once and rendered for both
+        targets; dbt reuses the SQL column results.
+        """
+        columns = _parse_columns(table_spec)
+        sql_results: list[dict] = []
+        pyspark_results: list[dict] = []
+        for col in columns:
+            steps = _plan(col.transformations)
+            sql_results.append(self.compile_column(col, "sql", dialect, steps))
+            pyspark_results.append(
+                self.compile_column(col, "pyspark", "pyspark", steps)
+            )
+        return {
+            "sql": self.compile_table_sql(
+                table_spec, dialect, project_config, sql_results
+            ),
+            "pyspark": self.compile_table_pyspark(
+                table_spec, project_config, pyspark_results
+            ),
+            "dbt": self.compile_table_dbt(
+                table_spec, dialect, project_config, sql_results, columns
+            ),
+        }
+
+    def compile_table(
+        self, target: str, table_spec: dict, dialect: str, project_config: dict
+    ) -> dict:
+        """Compile for "sql", "pyspark", "dbt" or "all"."""
+        if target == "all":
+            return self.compile_table_all(table_spec, dialect, project_config)
+        if target == "sql":
+            return self.compile_table_sql(table_spec, dialect, project_config)
+        if target == "pyspark":
+            return self.compile_table_pyspark(table_spec, project_config)
+        if target == "dbt":
+            return self.compile_table_dbt(table_spec, dialect, project_config)
+        raise ValueError(f"Unknown compile target: {target!r}")
+
     # ---------------------------------------------------------------- helpers
 
     @staticmethod
     def _build_schema_yml(
-        table_name: str, columns: list[dict], notes: dict
+        table_name: str, columns: list[Column], notes: dict
     ) -> str:
         lines = [
             "version: 2",
@@ -268,13 +447,71 @@ class TransformCompiler:
             f"  - name: {table_name}",
             "    columns:",
         ]
-        for col_dict in columns:
-            col = Column.model_validate(col_dict)
+        for col in columns:
             lines.append(f"      - name: {col.name}")
             note = notes.get(col.name, "")
             if note:
-                lines.append(f'        description: "{note}"')
+                # A JSON string is a valid YAML double-quoted scalar
+                lines.append(f"        description: {orjson.dumps(note).decode()}")
             if not col.nullable:
                 lines.append("        tests:")
                 lines.append("          - not_null")
         return "\n".join(lines) + "\n"
+
+
+# ------------------------------------------------------------ output cache
+
+# Compile output is a pure function of the table spec, dialect and catalog,
+# so it is memoized on the spec's canonical JSON bytes. Any edit to the spec
+# changes the key; nothing needs to be invalidated on save.
+
+
+def _spec_key(table_spec: dict) -> bytes:
+    return orjson.dumps(
+        {k: table_spec.get(k) for k in ("table", "columns", "notes")},
+        option=orjson.OPT_SORT_KEYS,
+    )
+
+
+@lru_cache(maxsize=2048)
+def _cached_fragment(column_key: str, target: str, dialect: str) -> dict:
+    column = Column.model_validate_json(column_key)
+    return TransformCompiler().compile_column(column, target, dialect)
+
+
+class _FragmentCachingCompiler(TransformCompiler):
+    """Reuses the fragments of columns that did not change.
+
+    Editing one column changes the spec key and misses the table cache, but
+    every other column is keyed on its own JSON and still hits.
+    """
+
+    def compile_column(
+        self,
+        column: Column,
+        target: str,
+        dialect: str,
+        steps: list[tuple[str, dict]] | None = None,
+    ) -> dict:
+        return _cached_fragment(column.model_dump_json(), target, dialect)
+
+
+@lru_cache(maxsize=256)
+def _compile_cached(spec_key: bytes, target: str, dialect: str, catalog: str) -> dict:
+    return _FragmentCachingCompiler().compile_table(
+        target, orjson.loads(spec_key), dialect, {"catalog": catalog}
+    )
+
+
+def compile_table_cached(
+    target: str, table_spec: dict, dialect: str, project_config: dict
+) -> dict:
+    """Memoized compile for "sql", "pyspark", "dbt" or "all".
+
+    Results are shared between callers and must be treated as read-only.
+    """
+    if target == "pyspark":
+        dialect = "pyspark"  # PySpark output does not depend on the dialect
+    return _compile_cached(
+        _spec_key(table_spec), target, dialect, project_config.get("catalog", "")
+    )
@@ -1,9 +1,71 @@
 from __future__ import annotations
 
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING
+
 import duckdb
-import pandas as pd
+import pyarrow as pa
+
+from app.models.spec import COLUMNS_ADAPTER, Column
+from app.services.tabular import rows_to_arrow
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+def _connect() -> duckdb.DuckDBPyConnection:
+    # A fresh in-memory database per query. User SQL may create tables, COMMIT
+    # or change settings; none of it can reach another request, and concurrent
+    # requests never contend on a shared catalog.
+    return duckdb.connect(":memory:")
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _to_arrow(data: list[dict] | pa.Table) -> pa.Table | pd.DataFrame:
+    """Arrow table for DuckDB to scan without copying; pandas as fallback."""
+    if isinstance(data, pa.Table):
+        return data
+    table = rows_to_arrow(data)
+    if table is not None:
+        return table
+    import pandas as pd  # fallback for rows Arrow cannot type
+
+    return pd.DataFrame(data)
 
-from app.models.spec import Column
+
+# CSV columns are sniffed as these types only. DuckDB would otherwise turn
+# date-like strings into DATE/TIMESTAMP, and string transforms such as TRIM
+# would no longer bind — the same values arrive as text from every other
+# format.
+_CSV_TYPES = ["BOOLEAN", "BIGINT", "DOUBLE", "VARCHAR"]
+
+# Saved synthetic-data files DuckDB scans itself, by suffix.
+_FILE_READERS = {
+    ".csv": lambda conn, path: conn.read_csv(
+        path, header=True, auto_type_candidates=_CSV_TYPES
+    ),
+    ".parquet": lambda conn, path: conn.read_parquet(path),
+}
+
+
+def _register(
+    conn: duckdb.DuckDBPyConnection,
+    table_name: str,
+    data: list[dict] | pa.Table | Path,
+) -> None:
+    """Expose data to the connection's queries as table_name.
+
+    A file path is registered as a relation over DuckDB's own reader, so the
+    file is scanned in place instead of being parsed in Python first.
+    """
+    if isinstance(data, Path):
+        conn.register(table_name, _FILE_READERS[data.suffix](conn, str(data)))
+    elif isinstance(data, pa.Table) or data:
+        conn.register(table_name, _to_arrow(data))
 
 
 class DuckDBExecutor:
@@ -11,18 +73,18 @@ class DuckDBExecutor:
     # ------------------------------------------------------------ execution
 
     def execute_sql(
-        self, query: str, data: list[dict], table_name: str
+        self, query: str, data: list[dict] | pa.Table, table_name: str
     ) -> dict:
+        conn = _connect()
         try:
-            conn = duckdb.connect(":memory:")
-            if data:
-                df = pd.DataFrame(data)
-                conn.register(table_name, df)
+            _register(conn, table_name, data)
             conn.execute(query)
-            columns = [d[0] for d in conn.description] if conn.description else []
-            rows_raw = conn.fetchall()
-            rows = [dict(zip(columns, row)) for row in rows_raw]
-            conn.close()
+            if conn.description:
+                result = conn.to_arrow_table()
+                columns = result.column_names
+                rows = result.to_pylist()
+            else:
+                columns, rows = [], []
             return {
                 "success": True,
                 "rows": rows,
@@ -38,6 +100,8 @@ class DuckDBExecutor:
                 "row_count": 0,
                 "error": str(exc),
             }
+        finally:
+            conn.close()
 
     # ---------------------------------------------------------- assertions
 
@@ -70,21 +134,33 @@ class DuckDBExecutor:
             })
         return assertions
 
-    def run_assertion(self, assertion: dict, rows: list[dict]) -> dict:
+    def run_assertion(
+        self, assertion: dict, rows: list[dict] | None = None
+    ) -> dict:
+        """Evaluate one assertion.
+
+        Counts precomputed by DuckDB ("row_count", "null_count") are used
+        when present on the assertion; otherwise they are derived from rows.
+        """
         atype = assertion["type"]
         description = assertion["description"]
 
         if atype == "row_count_gte":
-            passed = len(rows) >= assertion["min"]
+            row_count = assertion.get("row_count")
+            if row_count is None:
+                row_count = len(rows or [])
+            passed = row_count >= assertion["min"]
             detail = (
                 ""
                 if passed
-                else f"Expected >= {assertion['min']} rows, got {len(rows)}"
+                else f"Expected >= {assertion['min']} rows, got {row_count}"
             )
 
         elif atype == "not_null":
             col = assertion["column"]
-            null_count = sum(1 for r in rows if r.get(col) is None)
+            null_count = assertion.get("null_count")
+            if null_count is None:
+                null_count = sum(1 for r in rows or [] if r.get(col) is None)
             passed = null_count == 0
             detail = "" if passed else f"{null_count} null(s) found in '{col}'"
 
@@ -111,23 +187,89 @@ class DuckDBExecutor:
 
     # ----------------------------------------------------------- validation
 
+    def _result_stats(
+        self,
+        query: str,
+        data: list[dict] | pa.Table | Path,
+        table_name: str,
+        not_null_columns: list[str],
+    ) -> dict:
+        """Row count and per-column null counts of a query, computed in DuckDB.
+
+        Multi-statement SQL is measured on its last statement. The result is
+        materialized once and aggregated in a single COUNT(*) - COUNT(col)
+        pass. Columns missing from the result count every row as null.
+        """
+        conn = _connect()
+        try:
+            _register(conn, table_name, data)
+            # Only the final statement produces the result; earlier ones (temp
+            # tables, SET, ...) run as written, the same as in execute_sql.
+            statements = duckdb.extract_statements(query)
+            if not statements:
+                raise ValueError("No SQL statement to validate")
+            for statement in statements[:-1]:
+                conn.execute(statement.query)
+            final = statements[-1].query.strip().rstrip(";")
+            conn.execute(f"CREATE TEMP TABLE _validation_result AS {final}")
+            result_columns = {
+                d[0]
+                for d in conn.execute(
+                    "SELECT * FROM _validation_result LIMIT 0"
+                ).description
+            }
+            present = [c for c in not_null_columns if c in result_columns]
+            aggregates = ["COUNT(*)"] + [
+                f"COUNT(*) - COUNT({_quote(c)})" for c in present
+            ]
+            counts = conn.execute(
+                f"SELECT {', '.join(aggregates)} FROM _validation_result"
+            ).fetchone()
+            row_count = counts[0]
+            null_counts = {c: row_count for c in not_null_columns}
+            null_counts.update(zip(present, counts[1:]))
+            return {
+                "success": True,
+                "row_count": row_count,
+                "null_counts": null_counts,
+                "error": "",
+            }
+        except Exception as exc:
+            return {
+                "success": False,
+                "row_count": 0,
+                "null_counts": {c: 0 for c in not_null_columns},
+                "error": str(exc),
+            }
+        finally:
+            conn.close()
+
     def validate_table(
         self,
         table_spec: dict,
         compiled_sql: str,
-        synthetic_data: list[dict],
+        synthetic_data: list[dict] | pa.Table | Path,
     ) -> dict:
         table_name = table_spec["table"]["name"]
-        exec_result = self.execute_sql(compiled_sql, synthetic_data, table_name)
-        rows = exec_result["rows"]
+        columns = COLUMNS_ADAPTER.validate_python(table_spec["columns"])
+        stats = self._result_stats(
+            compiled_sql,
+            synthetic_data,
+            table_name,
+            [col.name for col in columns if not col.nullable],
+        )
 
         all_results: list[dict] = []
         columns_report: dict = {}
 
-        for col_dict in table_spec["columns"]:
-            col = Column.model_validate(col_dict)
+        for col in columns:
             assertions = self.generate_assertions(col)
-            col_results = [self.run_assertion(a, rows) for a in assertions]
+            for a in assertions:
+                if a["type"] == "row_count_gte":
+                    a["row_count"] = stats["row_count"]
+                elif a["type"] == "not_null":
+                    a["null_count"] = stats["null_counts"][a["column"]]
+            col_results = [self.run_assertion(a) for a in assertions]
             all_results.extend(col_results)
             columns_report[col.name] = {
                 "passed": all(r["passed"] for r in col_results),
@@ -143,9 +285,15 @@ class DuckDBExecutor:
             "passed_count": passed_count,
             "failed_count": total - passed_count,
             "execution": {
-                "success": exec_result["success"],
-                "row_count": exec_result["row_count"],
-                "error": exec_result["error"],
+                "success": stats["success"],
+                "row_count": stats["row_count"],
+                "error": stats["error"],
             },
             "columns": columns_report,
         }
+
+
+@lru_cache(maxsize=1)
+def get_executor() -> DuckDBExecutor:
+    """Shared executor; every instance runs on the module's DuckDB database."""
+    return DuckDBExecutor()
@@ -1,11 +1,90 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import json
-import re
+import os
+import threading
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import lru_cache
+
+import httpx
+import orjson
+
+from app.services.llm.http import async_client
+
+# Exact-match cache of generated rows, keyed on provider identity and the
+# prompt inputs. Off unless LLM_CACHE_SIZE > 0: sampling is non-deterministic,
+# so repeating a request normally means "give me different rows".
+_ROW_CACHE: OrderedDict[str, list[dict]] = OrderedDict()
+_ROW_CACHE_LOCK = threading.Lock()
+
+
+def _row_cache_size() -> int:
+    return int(os.getenv("LLM_CACHE_SIZE", "0"))
+
+
+def _max_concurrency() -> int:
+    # Chunks in flight at once; hosted APIs rate-limit bursts of requests.
+    return max(1, int(os.getenv("LLM_MAX_CONCURRENCY", "4")))
+
+
+def _find_json_array(raw: str) -> str | None:
+    """Return raw from the first [ to its matching ], or None.
+
+    Brackets inside JSON string literals (including escaped quotes) are
+    ignored, so the scan is a single pass over the text.
+    """
+    start = raw.find("[")
+    if start == -1:
+        return None
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(raw)):
+        ch = raw[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == "[":
+            depth += 1
+        elif ch == "]":
+            depth -= 1
+            if depth == 0:
+                return raw[start : i + 1]
+    return None
+
+
+def _loads_rows(text: str) -> list[dict] | None:
+    """Parse text as a JSON array of objects, or None if it is not one."""
+    try:
+        result = orjson.loads(text)
+    except orjson.JSONDecodeError:
+        # orjson rejects what stdlib accepts, e.g. NaN and Infinity literals.
+        try:
+            result = json.loads(text)
+        except ValueError:
+            return None
+    if isinstance(result, list) and all(isinstance(r, dict) for r in result):
+        return result
+    return None
+
+
+class ProviderUnavailableError(RuntimeError):
+    """The configured provider cannot run in this environment."""
 
 
 class BaseLLMProvider(ABC):
+    # Rows per prompt when a request is split into concurrent generations.
+    ROW_CHUNK = 50
+
     @abstractmethod
     def generate_synthetic_data(
         self,
@@ -15,6 +94,113 @@ class BaseLLMProvider(ABC):
     ) -> list[dict]:
         ...
 
+    def _chunk_rowcounts(self, total: int, chunk: int | None = None) -> list[int]:
+        chunk = chunk or self.ROW_CHUNK
+        full, rest = divmod(total, chunk)
+        return [chunk] * full + ([rest] if rest else [])
+
+    def generate_rows(
+        self,
+        schema: list[dict],
+        column_notes: dict,
+        row_count: int,
+    ) -> list[dict]:
+        """Generate row_count rows, in ROW_CHUNK-sized batches when large.
+
+        Many short generations finish sooner than one long one and keep the
+        model server busy; the parsed batches are concatenated in order.
+        """
+        if row_count <= 0:
+            return []
+        cache_size = _row_cache_size()
+        if cache_size > 0:
+            key = self._row_cache_key(schema, column_notes, row_count)
+            with _ROW_CACHE_LOCK:
+                hit = _ROW_CACHE.get(key)
+                if hit is not None:
+                    _ROW_CACHE.move_to_end(key)
+                    return [dict(row) for row in hit]
+
+        counts = self._chunk_rowcounts(row_count)
+        if len(counts) == 1:
+            rows = self.generate_synthetic_data(schema, column_notes, row_count)
+        else:
+            batches = self.generate_synthetic_data_batch(schema, column_notes, counts)
+            rows = [row for batch in batches for row in batch]
+
+        if cache_size > 0:
+            with _ROW_CACHE_LOCK:
+                _ROW_CACHE[key] = [dict(row) for row in rows]
+                while len(_ROW_CACHE) > cache_size:
+                    _ROW_CACHE.popitem(last=False)
+        return rows
+
+    def _cache_identity(self) -> str:
+        """Distinguishes providers/models that share a row cache."""
+        return type(self).__qualname__
+
+    def _row_cache_key(
+        self, schema: list[dict], column_notes: dict, row_count: int
+    ) -> str:
+        payload = orjson.dumps(
+            [self._cache_identity(), schema, column_notes, row_count],
+            option=orjson.OPT_SORT_KEYS,
+        )
+        return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+    async def agenerate_synthetic_data(
+        self,
+        schema: list[dict],
+        column_notes: dict,
+        row_count: int,
+        client: httpx.AsyncClient | None = None,
+        row_offset: int | None = None,
+    ) -> list[dict]:
+        """Async variant; HTTP providers override it to share ``client``.
+
+        row_offset marks one chunk of a larger request (see
+        build_data_prompt); this fallback ignores it.
+        """
+        return await asyncio.to_thread(
+            self.generate_synthetic_data, schema, column_notes, row_count
+        )
+
+    def generate_synthetic_data_batch(
+        self,
+        schema: list[dict],
+        column_notes: dict,
+        row_counts: list[int],
+    ) -> list[list[dict]]:
+        """One generation per entry of row_counts, issued concurrently.
+
+        At most LLM_MAX_CONCURRENCY generations are in flight at once. Must
+        be called from a thread without a running event loop (sync
+        FastAPI handlers run in the threadpool).
+        """
+        return asyncio.run(self._agenerate_batch(schema, column_notes, row_counts))
+
+    async def _agenerate_batch(
+        self,
+        schema: list[dict],
+        column_notes: dict,
+        row_counts: list[int],
+    ) -> list[list[dict]]:
+        limit = asyncio.Semaphore(_max_concurrency())
+        offsets = [sum(row_counts[:i]) for i in range(len(row_counts))]
+
+        async def one(n: int, offset: int) -> list[dict]:
+            async with limit:
+                return await self.agenerate_synthetic_data(
+                    schema, column_notes, n, client, row_offset=offset
+                )
+
+        async with async_client() as client:
+            return list(
+                await asyncio.gather(
+                    *(one(n, offset) for n, offset in zip(row_counts, offsets))
+                )
+            )
+
     @abstractmethod
     def is_available(self) -> bool:
         ...
@@ -25,61 +211,84 @@ class BaseLLMProvider(ABC):
         ...
 
 
+_PROMPT_HEADER = (
+    "Return ONLY a valid JSON array\n"
+    "No explanation, no markdown, no code blocks, no text before [\n"
+    "\n"
+    "Columns:"
+)
+_PROMPT_FOOTER = (
+    "\n"
+    "\n"
+    "Include realistic edge cases based on the instructions\n"
+    "Return only the JSON array starting with [ and ending with ]"
+)
+
+
+@lru_cache(maxsize=64)
+def _prompt_columns(key: bytes) -> str:
+    """Everything after the row-count line; built once per schema + notes."""
+    schema, column_notes = orjson.loads(key)
+    lines = []
+    for col in schema:
+        name = col["name"]
+        dtype = col.get("data_type", "string")
+        nullability = "nullable" if col.get("nullable", True) else "required"
+        note = column_notes.get(name) or "generate realistic data"
+        lines.append(f"\n  {name} ({dtype}, {nullability}): {note}")
+    return _PROMPT_HEADER + "".join(lines) + _PROMPT_FOOTER
+
+
 class PromptBuilderMixin:
     def build_data_prompt(
         self,
         schema: list[dict],
         column_notes: dict,
         row_count: int,
+        row_offset: int | None = None,
     ) -> str:
-        lines = [
-            f"Generate exactly {row_count} rows of JSON test data for a database table",
-            "Return ONLY a valid JSON array",
-            "No explanation, no markdown, no code blocks, no text before [",
-            "",
-            "Columns:",
-        ]
-        for col in schema:
-            name = col["name"]
-            dtype = col.get("data_type", "string")
-            nullable = col.get("nullable", True)
-            nullability = "nullable" if nullable else "required"
-            note = column_notes.get(name) or "generate realistic data"
-            lines.append(f"  {name} ({dtype}, {nullability}): {note}")
-
-        lines.append("")
-        lines.append("Include realistic edge cases based on the instructions")
-        lines.append("Return only the JSON array starting with [ and ending with ]")
-        return "\n".join(lines)
+        """row_offset is set when the prompt is one chunk of a larger request.
+
+        Each chunk is then told which rows it covers, so ids and sequences
+        continue across chunks instead of restarting in every one.
+        """
+        # Chunked generation builds many prompts for one schema; only the
+        # row count and offset differ between them.
+        key = orjson.dumps([schema, column_notes], option=orjson.OPT_SORT_KEYS)
+        header = (
+            f"Generate exactly {row_count} rows of JSON test data for a database table\n"
+        )
+        if row_offset is not None:
+            header += (
+                f"These are rows {row_offset + 1} to {row_offset + row_count} of a "
+                f"larger dataset: number ids and sequences from {row_offset + 1} "
+                "and do not repeat unique values from other rows\n"
+            )
+        return header + _prompt_columns(key)
 
     def parse_json_response(self, raw: str) -> list[dict]:
-        # Try 1: direct parse
-        try:
-            result = json.loads(raw.strip())
-            if isinstance(result, list) and all(isinstance(r, dict) for r in result):
+        # Try 1: direct parse, after dropping a ```json fence if present
+        text = raw.strip()
+        if text.startswith("```"):
+            text = text.removeprefix("```json").removeprefix("```")
+            text = text.removesuffix("```").strip()
+        result = _loads_rows(text)
+        if result is not None:
+            return result
+
+        # Try 2: first [ through its matching ] (linear bracket scan)
+        block = _find_json_array(raw)
+        if block is not None:
+            result = _loads_rows(block)
+            if result is not None:
                 return result
-        except (json.JSONDecodeError, ValueError):
-            pass
-
-        # Try 2: regex find first [...] block
-        match = re.search(r"\[.*?\]", raw, re.DOTALL)
-        if match:
-            try:
-                result = json.loads(match.group(0))
-                if isinstance(result, list) and all(isinstance(r, dict) for r in result):
-                    return result
-            except (json.JSONDecodeError, ValueError):
-                pass
 
         # Try 3: find content between first [ and last ]
         first = raw.find("[")
         last = raw.rfind("]")
         if first != -1 and last != -1 and last > first:
-            try:
-                result = json.loads(raw[first : last + 1])
-                if isinstance(result, list) and all(isinstance(r, dict) for r in result):
-                    return result
-            except (json.JSONDecodeError, ValueError):
-                pass
+            result = _loads_rows(raw[first : last + 1])
+            if result is not None:
+                return result
 
         raise ValueError(f"LLM returned invalid JSON: {raw[:200]}")
@@ -1,32 +1,53 @@
 from __future__ import annotations
 
 import os
+from functools import lru_cache
 
 from app.services.llm.base import BaseLLMProvider
 
 
-def get_llm_provider() -> BaseLLMProvider:
-    provider = os.getenv("LLM_PROVIDER", "phi3")
-
+@lru_cache(maxsize=None)
+def _build_provider(provider: str, *config: str) -> BaseLLMProvider:
     if provider == "phi3":
         from app.services.llm.providers.phi3 import Phi3Provider
         return Phi3Provider()
 
     if provider == "ollama":
         from app.services.llm.providers.ollama import OllamaProvider
-        return OllamaProvider(
-            model=os.getenv("OLLAMA_MODEL", "mistral"),
-            host=os.getenv("OLLAMA_HOST", "http://localhost:11434"),
-        )
+        model, host = config
+        return OllamaProvider(model=model, host=host)
 
     if provider == "openai":
         from app.services.llm.providers.openai_compat import OpenAICompatProvider
-        return OpenAICompatProvider(
-            base_url=os.getenv("OPENAI_BASE_URL", ""),
-            api_key=os.getenv("OPENAI_API_KEY", ""),
-            model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
-        )
+        base_url, api_key, model = config
+        return OpenAICompatProvider(base_url=base_url, api_key=api_key, model=model)
 
     raise ValueError(
         f"Unknown LLM_PROVIDER: {provider}. Valid options: phi3, ollama, openai"
     )
+
+
+def get_llm_provider() -> BaseLLMProvider:
+    """Shared provider for the current LLM_* environment.
+
+    Instances are cached on their configuration so the Phi-3 pipeline is
+    loaded once per process instead of once per request.
+    """
+    provider = os.getenv("LLM_PROVIDER", "phi3")
+
+    if provider == "ollama":
+        return _build_provider(
+            provider,
+            os.getenv("OLLAMA_MODEL", "mistral"),
+            os.getenv("OLLAMA_HOST", "http://localhost:11434"),
+        )
+
+    if provider == "openai":
+        return _build_provider(
+            provider,
+            os.getenv("OPENAI_BASE_URL", ""),
+            os.getenv("OPENAI_API_KEY", ""),
+            os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
+        )
+
+    return _build_provider(provider)
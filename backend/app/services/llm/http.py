@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+import httpx
+
+# Shared by the HTTP providers so repeated generations reuse pooled
+# keep-alive connections instead of paying a TCP/TLS handshake per call.
+# Per-call timeouts are passed at the call sites.
+LIMITS = httpx.Limits(
+    max_keepalive_connections=20, max_connections=100, keepalive_expiry=30.0
+)
+TIMEOUT = httpx.Timeout(120.0, connect=10.0)
+CLIENT = httpx.Client(limits=LIMITS, timeout=TIMEOUT)
+
+
+def async_client() -> httpx.AsyncClient:
+    """AsyncClient for one batch; its pool is bound to the running event loop."""
+    return httpx.AsyncClient(limits=LIMITS, timeout=TIMEOUT)
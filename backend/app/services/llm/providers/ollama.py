@@ -1,6 +1,10 @@
 from __future__ import annotations
 
+import httpx
+import orjson
+
 from app.services.llm.base import BaseLLMProvider, PromptBuilderMixin
+from app.services.llm.http import CLIENT, async_client
 
 
 class OllamaProvider(BaseLLMProvider, PromptBuilderMixin):
@@ -12,29 +16,69 @@ class OllamaProvider(BaseLLMProvider, PromptBuilderMixin):
         self.model = model
         self.host = host
 
+    def _request(self, prompt: str) -> dict:
+        return {
+            "url": f"{self.host}/api/generate",
+            "json": {"model": self.model, "prompt": prompt, "stream": True},
+            "timeout": 120,
+        }
+
+    @staticmethod
+    def _append_chunk(parts: list[str], line: str) -> bool:
+        # Each streamed line is {"response": "<text piece>", "done": bool}, or
+        # {"error": "..."} when generation fails after the 200 was sent.
+        # Returns True once the final piece has arrived.
+        if not line:
+            return False
+        chunk = orjson.loads(line)
+        if "error" in chunk:
+            raise RuntimeError(f"Ollama error: {chunk['error']}")
+        parts.append(chunk.get("response", ""))
+        return bool(chunk.get("done"))
+
     def generate_synthetic_data(
         self,
         schema: list[dict],
         column_notes: dict,
         row_count: int,
     ) -> list[dict]:
-        import httpx
-
         prompt = self.build_data_prompt(schema, column_notes, row_count)
-        response = httpx.post(
-            f"{self.host}/api/generate",
-            json={"model": self.model, "prompt": prompt, "stream": False},
-            timeout=120,
-        )
-        response.raise_for_status()
-        raw = response.json()["response"]
-        return self.parse_json_response(raw)
+        parts: list[str] = []
+        with CLIENT.stream("POST", **self._request(prompt)) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if self._append_chunk(parts, line):
+                    break
+        return self.parse_json_response("".join(parts))
+
+    async def agenerate_synthetic_data(
+        self,
+        schema: list[dict],
+        column_notes: dict,
+        row_count: int,
+        client: httpx.AsyncClient | None = None,
+        row_offset: int | None = None,
+    ) -> list[dict]:
+        if client is None:
+            async with async_client() as client:
+                return await self.agenerate_synthetic_data(
+                    schema, column_notes, row_count, client, row_offset
+                )
+        prompt = self.build_data_prompt(schema, column_notes, row_count, row_offset)
+        parts: list[str] = []
+        async with client.stream("POST", **self._request(prompt)) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if self._append_chunk(parts, line):
+                    break
+        return self.parse_json_response("".join(parts))
+
+    def _cache_identity(self) -> str:
+        return f"OllamaProvider|{self.host}|{self.model}"
 
     def is_available(self) -> bool:
         try:
-            import httpx
-
-            resp = httpx.get(f"{self.host}/api/tags", timeout=3)
+            resp = CLIENT.get(f"{self.host}/api/tags", timeout=3)
             return resp.status_code == 200
         except Exception:
             return False
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
+import httpx
+
 from app.services.llm.base import BaseLLMProvider, PromptBuilderMixin
+from app.services.llm.http import CLIENT, async_client
 
 
 class OpenAICompatProvider(BaseLLMProvider, PromptBuilderMixin):
@@ -14,30 +17,52 @@ class OpenAICompatProvider(BaseLLMProvider, PromptBuilderMixin):
         self.api_key = api_key
         self.model = model
 
-    def generate_synthetic_data(
-        self,
-        schema: list[dict],
-        column_notes: dict,
-        row_count: int,
-    ) -> list[dict]:
-        import httpx
-
-        prompt = self.build_data_prompt(schema, column_notes, row_count)
-        response = httpx.post(
-            f"{self.base_url}/chat/completions",
-            headers={"Authorization": f"Bearer {self.api_key}"},
-            json={
+    def _request(self, prompt: str) -> dict:
+        return {
+            "url": f"{self.base_url}/chat/completions",
+            "headers": {"Authorization": f"Bearer {self.api_key}"},
+            "json": {
                 "model": self.model,
                 "messages": [{"role": "user", "content": prompt}],
                 "temperature": 0.7,
                 "max_tokens": 4096,
             },
-            timeout=60,
-        )
+            "timeout": 60,
+        }
+
+    def _parse(self, response: httpx.Response) -> list[dict]:
         response.raise_for_status()
         raw = response.json()["choices"][0]["message"]["content"]
         return self.parse_json_response(raw)
 
+    def generate_synthetic_data(
+        self,
+        schema: list[dict],
+        column_notes: dict,
+        row_count: int,
+    ) -> list[dict]:
+        prompt = self.build_data_prompt(schema, column_notes, row_count)
+        return self._parse(CLIENT.post(**self._request(prompt)))
+
+    async def agenerate_synthetic_data(
+        self,
+        schema: list[dict],
+        column_notes: dict,
+        row_count: int,
+        client: httpx.AsyncClient | None = None,
+        row_offset: int | None = None,
+    ) -> list[dict]:
+        if client is None:
+            async with async_client() as client:
+                return await self.agenerate_synthetic_data(
+                    schema, column_notes, row_count, client, row_offset
+                )
+        prompt = self.build_data_prompt(schema, column_notes, row_count, row_offset)
+        return self._parse(await client.post(**self._request(prompt)))
+
+    def _cache_identity(self) -> str:
+        return f"OpenAICompatProvider|{self.base_url}|{self.model}"
+
     def is_available(self) -> bool:
         return bool(self.api_key)
 
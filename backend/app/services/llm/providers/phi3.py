@@ -1,47 +1,162 @@
 from __future__ import annotations
 
-from app.services.llm.base import BaseLLMProvider, PromptBuilderMixin
+import importlib.util
+import os
+import threading
+from functools import lru_cache
+
+from app.services.llm.base import (
+    BaseLLMProvider,
+    PromptBuilderMixin,
+    ProviderUnavailableError,
+)
+
+
+# torch/transformers stay lazy (they are heavy); what we learn about them is
+# probed once per process.
+
+
+@lru_cache(maxsize=1)
+def _transformers_installed() -> bool:
+    return importlib.util.find_spec("transformers") is not None
+
+
+@lru_cache(maxsize=1)
+def _torch_dtype():
+    import torch
+
+    return torch.float16 if torch.cuda.is_available() else torch.float32
+
+
+@lru_cache(maxsize=1)
+def _model_kwargs() -> dict:
+    """4-bit NF4 weights when bitsandbytes and a GPU are present, else none."""
+    if importlib.util.find_spec("bitsandbytes") is None:
+        return {}
+    import torch
+
+    if not torch.cuda.is_available():
+        return {}
+    from transformers import BitsAndBytesConfig
+
+    return {
+        "quantization_config": BitsAndBytesConfig(
+            load_in_4bit=True,
+            bnb_4bit_compute_dtype=torch.float16,
+            bnb_4bit_use_double_quant=True,
+            bnb_4bit_quant_type="nf4",
+        )
+    }
 
 
 class Phi3Provider(BaseLLMProvider, PromptBuilderMixin):
     MODEL_ID = "microsoft/Phi-3-mini-4k-instruct"
+    # Prompts decoded together on the device per forward pass.
+    BATCH_SIZE = 8
 
     def __init__(self) -> None:
         self._pipe = None
+        # The provider is shared across threadpool workers; the pipeline is
+        # neither safe to load twice nor to run concurrently.
+        self._lock = threading.Lock()
+        # find_spec only proves transformers is on the path; the real import
+        # (torch, its native libraries, ...) can still fail on first use.
+        self._import_error: ImportError | None = None
 
     def _load(self) -> None:
         if self._pipe is None:
             from transformers import pipeline
-            import torch
 
-            self._pipe = pipeline(
+            model_kwargs = _model_kwargs()
+            pipe = pipeline(
                 "text-generation",
                 model=self.MODEL_ID,
-                torch_dtype=torch.float16 if torch.cuda.is_available() else torch.float32,
+                torch_dtype=_torch_dtype(),
                 device_map="auto",
                 trust_remote_code=True,
+                model_kwargs=model_kwargs,
             )
+            # Batched prompts of different lengths need a pad token.
+            if pipe.tokenizer.pad_token is None:
+                pipe.tokenizer.pad_token = pipe.tokenizer.eos_token
+            # Kernel fusion pays off on long GPU decodes but compiling takes
+            # minutes, so it is opt-in. Only forward is compiled: generate()
+            # is looked up on the model, and a compiled wrapper would forward
+            # it to the uncompiled module. bnb 4-bit layers are not compiled.
+            if (
+                os.getenv("PHI3_TORCH_COMPILE") == "1"
+                and "quantization_config" not in model_kwargs
+            ):
+                import torch
 
-    def generate_synthetic_data(
+                pipe.model.forward = torch.compile(
+                    pipe.model.forward, mode="reduce-overhead", fullgraph=False
+                )
+            self._pipe = pipe
+
+    def _run(self, inputs, **kwargs) -> list:
+        with self._lock:
+            try:
+                import torch
+
+                self._load()
+            except ImportError as e:
+                self._import_error = e
+                raise ProviderUnavailableError(
+                    f"Phi-3 provider unavailable: {e}"
+                ) from e
+            with torch.inference_mode():
+                return self._pipe(
+                    inputs, max_new_tokens=4096, temperature=0.7, **kwargs
+                )
+
+    def _chat_prompt(
         self,
         schema: list[dict],
         column_notes: dict,
         row_count: int,
-    ) -> list[dict]:
-        self._load()
-        prompt = self.build_data_prompt(schema, column_notes, row_count)
-        chat_prompt = f"<|user|>{prompt}<|end|>\n<|assistant|>"
-        output = self._pipe(chat_prompt, max_new_tokens=4096, temperature=0.7)
+        row_offset: int | None = None,
+    ) -> str:
+        prompt = self.build_data_prompt(schema, column_notes, row_count, row_offset)
+        return f"<|user|>{prompt}<|end|>\n<|assistant|>"
+
+    def _parse_output(self, output: list[dict], chat_prompt: str) -> list[dict]:
         generated_text = output[0]["generated_text"]
         remainder = generated_text[len(chat_prompt):]
         return self.parse_json_response(remainder)
 
+    def generate_synthetic_data(
+        self,
+        schema: list[dict],
+        column_notes: dict,
+        row_count: int,
+    ) -> list[dict]:
+        chat_prompt = self._chat_prompt(schema, column_notes, row_count)
+        output = self._run(chat_prompt)
+        return self._parse_output(output, chat_prompt)
+
+    def generate_synthetic_data_batch(
+        self,
+        schema: list[dict],
+        column_notes: dict,
+        row_counts: list[int],
+    ) -> list[list[dict]]:
+        # Local model: batched forward passes instead of concurrent calls.
+        chat_prompts = []
+        offset = 0
+        for n in row_counts:
+            chat_prompts.append(self._chat_prompt(schema, column_notes, n, offset))
+            offset += n
+        outputs = self._run(
+            chat_prompts, batch_size=min(len(chat_prompts), self.BATCH_SIZE)
+        )
+        return [
+            self._parse_output(output, chat_prompt)
+            for output, chat_prompt in zip(outputs, chat_prompts)
+        ]
+
     def is_available(self) -> bool:
-        try:
-            import transformers  # noqa: F401
-            return True
-        except ImportError:
-            return False
+        return self._import_error is None and _transformers_installed()
 
     def get_provider_info(self) -> dict:
         return {
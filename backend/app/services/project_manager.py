@@ -1,19 +1,169 @@
 from __future__ import annotations
 
-import json
+import csv
 import os
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
 
-import pandas as pd
+import orjson
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
 
 from app.models.requests import CreateProjectRequest, CreateTableRequest
-from app.models.spec import Column, ProjectConfig
+from app.models.spec import COLUMNS_ADAPTER, Column, ProjectConfig
+from app.services.tabular import rows_to_arrow
+
+
+# ------------------------------------------------------------- read caches
+
+# Parsed files are keyed on (path, mtime_ns, size) so edits on disk miss the
+# cache. Writes also clear it, since two writes can land in one mtime tick.
+# Cached values are shared between callers — treat them as read-only.
+# Every edit leaves its stale entry behind until it is evicted, and synthetic
+# data can be large, so the caches hold a few recent tables rather than whole
+# projects.
+
+
+@lru_cache(maxsize=32)
+def _read_json_cached(path: str, mtime_ns: int, size: int):
+    return orjson.loads(Path(path).read_bytes())
+
+
+def _read_json(path: Path):
+    st = path.stat()
+    return _read_json_cached(str(path), st.st_mtime_ns, st.st_size)
+
+
+@lru_cache(maxsize=8)
+def _list_projects_cached(projects_dir: str, mtime_ns: int) -> tuple[dict, ...]:
+    # Keyed on the directory mtime, which moves when a project is added or
+    # removed; project.json is never rewritten after create_project.
+    projects = []
+    with os.scandir(projects_dir) as it:
+        project_dirs = [e.path for e in it if e.name.endswith(".tforge") and e.is_dir()]
+    for path in project_dirs:
+        config_file = Path(path) / "project.json"
+        if config_file.exists():
+            projects.append(_read_json(config_file))
+    return tuple(projects)
+
+
+@lru_cache(maxsize=32)
+def _table_spec_cached(
+    table_path: str, config_file: str, layer: str, table_name: str, stamps: tuple
+) -> dict:
+    # stamps holds (mtime_ns, size) for project.json and both table files.
+    return {
+        "project": _read_json_cached(config_file, *stamps[0]),
+        "table": {"name": table_name, "layer": layer},
+        "columns": _read_json_cached(f"{table_path}/transformations.json", *stamps[1]),
+        "notes": _read_json_cached(f"{table_path}/column_notes.json", *stamps[2]),
+    }
+
+
+@lru_cache(maxsize=16)
+def _read_synthetic_cached(path: str, fmt: str, mtime_ns: int, size: int) -> list[dict]:
+    # JSON formats are already stored as records; parse them directly.
+    if fmt == "json":
+        return orjson.loads(Path(path).read_bytes())
+    if fmt == "ndjson":
+        lines = Path(path).read_bytes().splitlines()
+        return [orjson.loads(line) for line in lines if line]
+    if fmt == "parquet":
+        return pq.read_table(path).to_pylist()
+    import pandas as pd  # only the csv/xlsx readers need it
+
+    if fmt == "csv":
+        df = pd.read_csv(path)
+    elif fmt == "xlsx":
+        df = pd.read_excel(path)
+    return df.to_dict(orient="records")
+
+
+@lru_cache(maxsize=16)
+def _read_synthetic_table_cached(
+    path: str, fmt: str, mtime_ns: int, size: int
+) -> pa.Table | None:
+    # csv and parquet never get here: validation scans them in DuckDB.
+    return rows_to_arrow(_read_synthetic_cached(path, fmt, mtime_ns, size))
+
+
+# ------------------------------------------------------------- writers
+
+_JSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _dump_json(obj, *, indent: bool = False) -> bytes:
+    # Metadata files are only read back by the API, so they are compact;
+    # project.json and exported json data stay indented for people.
+    option = _JSON_OPTIONS | orjson.OPT_INDENT_2 if indent else _JSON_OPTIONS
+    return orjson.dumps(obj, option=option)
+
+
+# zstd packs typed columns tighter than the default snappy at similar
+# decode speed, so validation and reloads read fewer bytes.
+_PARQUET_COMPRESSION = "zstd"
+
+
+def _write_arrow(table: pa.Table | None, fmt: str, out: Path) -> bool:
+    """Write csv/parquet through Arrow; False if the rows need a fallback."""
+    if table is None:
+        return False
+    try:
+        if fmt == "csv":
+            pa_csv.write_csv(table, out)
+        else:
+            pq.write_table(table, out, compression=_PARQUET_COMPRESSION)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        return False  # e.g. nested values have no CSV representation
+    return True
+
+
+def _fieldnames(data: list[dict]) -> list[str]:
+    # Union of keys in first-seen order, like pd.DataFrame's columns.
+    return list(dict.fromkeys(key for row in data for key in row))
+
+
+def _write_csv_rows(data: list[dict], out: Path) -> None:
+    fieldnames = _fieldnames(data)
+    with open(out, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.DictWriter(fh, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(data)
+
+
+def _write_xlsx_rows(data: list[dict], out: Path) -> None:
+    # write_only streams rows to the file instead of holding every cell.
+    from openpyxl import Workbook
+
+    fieldnames = _fieldnames(data)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(fieldnames)
+    for row in data:
+        ws.append([_excel_cell(row.get(key)) for key in fieldnames])
+    wb.save(out)
+
+
+def _excel_cell(value):
+    # Nested values have no cell type; store their text, as pandas does.
+    return str(value) if isinstance(value, (dict, list)) else value
+
+
+def _invalidate_caches() -> None:
+    _list_projects_cached.cache_clear()
+    _table_spec_cached.cache_clear()
+    _read_json_cached.cache_clear()
+    _read_synthetic_cached.cache_clear()
+    _read_synthetic_table_cached.cache_clear()
 
 
 class ProjectManager:
-    def __init__(self) -> None:
-        projects_dir = os.getenv("PROJECTS_DIR", "./projects")
+    def __init__(self, projects_dir: str | None = None) -> None:
+        if projects_dir is None:
+            projects_dir = os.getenv("PROJECTS_DIR", "./projects")
         self.projects_dir = Path(projects_dir)
         self.projects_dir.mkdir(parents=True, exist_ok=True)
 
@@ -44,23 +194,25 @@ class ProjectManager:
             schema_layer=req.schema_layer,
             created_at=datetime.now(timezone.utc),
         )
-        data = config.model_dump(mode="json")
-        (project_path / "project.json").write_text(json.dumps(data, indent=2))
-        return data
+        (project_path / "project.json").write_bytes(
+            config.model_dump_json(indent=2).encode()
+        )
+        _invalidate_caches()
+        return config.model_dump(mode="json")
 
     def list_projects(self) -> list[dict]:
-        projects = []
-        for path in self.projects_dir.glob("*.tforge"):
-            config_file = path / "project.json"
-            if config_file.exists():
-                projects.append(json.loads(config_file.read_text()))
-        return projects
+        try:
+            mtime_ns = self.projects_dir.stat().st_mtime_ns
+        except FileNotFoundError:
+            return []
+        return list(_list_projects_cached(str(self.projects_dir), mtime_ns))
 
     def get_project(self, name: str) -> dict:
         config_file = self._project_path(name) / "project.json"
-        if not config_file.exists():
-            raise FileNotFoundError(f"Project '{name}' not found")
-        return json.loads(config_file.read_text())
+        try:
+            return _read_json(config_file)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Project '{name}' not found") from None
 
     # ----------------------------------------------------------------- tables
 
@@ -69,24 +221,29 @@ class ProjectManager:
         if not project_path.exists():
             raise FileNotFoundError(f"Project '{project_name}' not found")
 
-        table_path = self._table_path(project_name, req.layer, req.name)
-        table_path.mkdir(parents=True, exist_ok=True)
-
-        schema = [col.model_dump(mode="json") for col in req.columns]
-        (table_path / "schema.json").write_text(json.dumps(schema, indent=2))
-
-        # Reset transformations to all-default for each column
-        default_columns = [
-            Column(name=col.name, data_type=col.data_type, nullable=col.nullable)
-            .model_dump(mode="json")
-            for col in req.columns
-        ]
-        (table_path / "transformations.json").write_text(
-            json.dumps(default_columns, indent=2)
+        # schema.json is serialized straight from the models; one pass builds
+        # the other two files, with transformations reset to defaults.
+        defaults: list[Column] = []
+        notes: dict[str, str] = {}
+        for col in req.columns:
+            defaults.append(
+                Column(name=col.name, data_type=col.data_type, nullable=col.nullable)
+            )
+            notes[col.name] = ""
+        default_columns = COLUMNS_ADAPTER.dump_python(defaults, mode="json")
+
+        # Everything is serialized before the directory is touched, so a
+        # serialization error cannot leave a half-written table behind.
+        files = (
+            ("schema.json", COLUMNS_ADAPTER.dump_json(req.columns)),
+            ("transformations.json", _dump_json(default_columns)),
+            ("column_notes.json", _dump_json(notes)),
         )
-
-        notes = {col.name: "" for col in req.columns}
-        (table_path / "column_notes.json").write_text(json.dumps(notes, indent=2))
+        table_path = self._table_path(project_name, req.layer, req.name)
+        os.makedirs(table_path, exist_ok=True)
+        for filename, blob in files:
+            (table_path / filename).write_bytes(blob)
+        _invalidate_caches()
 
         return {
             "project": self.get_project(project_name),
@@ -99,26 +256,38 @@ class ProjectManager:
         self, project_name: str, layer: str, table_name: str
     ) -> dict:
         table_path = self._table_path(project_name, layer, table_name)
-        columns = json.loads((table_path / "transformations.json").read_text())
-        notes = json.loads((table_path / "column_notes.json").read_text())
-        return {
-            "project": self.get_project(project_name),
-            "table": {"name": table_name, "layer": layer},
-            "columns": columns,
-            "notes": notes,
-        }
+        config_file = self._project_path(project_name) / "project.json"
+        try:
+            config_st = config_file.stat()
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Project '{project_name}' not found") from None
+        stamps = tuple(
+            (st.st_mtime_ns, st.st_size)
+            for st in (
+                config_st,
+                (table_path / "transformations.json").stat(),
+                (table_path / "column_notes.json").stat(),
+            )
+        )
+        return _table_spec_cached(
+            str(table_path), str(config_file), layer, table_name, stamps
+        )
 
     def save_transformations(
         self,
         project_name: str,
         layer: str,
         table_name: str,
-        columns: list[dict],
+        columns: list[Column | dict],
     ) -> None:
         table_path = self._table_path(project_name, layer, table_name)
-        (table_path / "transformations.json").write_text(
-            json.dumps(columns, indent=2)
+        # Models pass through as-is; dicts are validated into models, so a
+        # malformed entry fails with a ValidationError before anything is written.
+        columns = COLUMNS_ADAPTER.validate_python(columns)
+        (table_path / "transformations.json").write_bytes(
+            COLUMNS_ADAPTER.dump_json(columns)
         )
+        _invalidate_caches()
 
     def save_column_notes(
         self,
@@ -128,68 +297,146 @@ class ProjectManager:
         notes: dict,
     ) -> None:
         table_path = self._table_path(project_name, layer, table_name)
-        (table_path / "column_notes.json").write_text(json.dumps(notes, indent=2))
+        (table_path / "column_notes.json").write_bytes(_dump_json(notes))
+        _invalidate_caches()
 
     def list_tables(self, project_name: str) -> dict:
         project_path = self._project_path(project_name)
         result: dict[str, list[str]] = {"bronze": [], "silver": [], "gold": []}
         for layer in result:
-            layer_path = project_path / layer
-            if layer_path.exists():
-                result[layer] = [p.name for p in layer_path.iterdir() if p.is_dir()]
+            # DirEntry.is_dir() is answered from readdir, without a stat per entry.
+            try:
+                with os.scandir(project_path / layer) as it:
+                    result[layer] = [e.name for e in it if e.is_dir()]
+            except FileNotFoundError:
+                pass
         return result
 
     # --------------------------------------------------------- synthetic data
 
     _FORMATS = ["csv", "json", "ndjson", "xlsx", "parquet"]
+    # Formats whose rows are converted to Arrow on save.
+    _TYPED_FORMATS = ("csv", "xlsx", "parquet")
+    _SIDECAR = "synthetic_data.cache.parquet"
+
+    def _find_synthetic(
+        self, table_path: Path
+    ) -> tuple[str, Path, str, os.stat_result]:
+        """Locate saved synthetic data and the cheapest file to parse it from.
+
+        Returns (saved format, path, format to parse path as, stat of path).
+        A csv/xlsx file is read from its parquet copy while that is fresh.
+        """
+        for fmt in self._FORMATS:
+            candidate = table_path / f"synthetic_data.{fmt}"
+            try:
+                st = candidate.stat()
+            except FileNotFoundError:
+                continue
+            if fmt in ("csv", "xlsx"):
+                sidecar = table_path / self._SIDECAR
+                try:
+                    sc_st = sidecar.stat()
+                except FileNotFoundError:
+                    pass
+                else:
+                    if sc_st.st_mtime_ns >= st.st_mtime_ns:
+                        return fmt, sidecar, "parquet", sc_st
+            return fmt, candidate, fmt, st
+        raise FileNotFoundError("No synthetic data found for this table")
 
     def save_synthetic_data(
         self,
         project_name: str,
         layer: str,
         table_name: str,
-        data: list[dict],
+        data: list[dict] | pa.Table | pa.RecordBatch,
         format: str,
     ) -> None:
+        """Persist rows, or an Arrow table/batch, as synthetic_data.<format>.
+
+        Rows are converted to Arrow at most once; Arrow input is written by
+        the csv/parquet writers as-is and only turned into rows for the
+        row-oriented formats.
+        """
         if format not in self._FORMATS:
             raise ValueError(f"Unsupported format: {format}")
         table_path = self._table_path(project_name, layer, table_name)
-        df = pd.DataFrame(data)
         out = table_path / f"synthetic_data.{format}"
-
-        if format == "csv":
-            df.to_csv(out, index=False)
-        elif format == "json":
-            df.to_json(out, orient="records", indent=2)
+        sidecar = table_path / self._SIDECAR
+        sidecar.unlink(missing_ok=True)
+        if isinstance(data, pa.RecordBatch):
+            data = pa.Table.from_batches([data])
+        if isinstance(data, pa.Table):
+            table = data
+            if format not in ("csv", "parquet"):
+                data = table.to_pylist()
+        else:
+            table = rows_to_arrow(data) if format in self._TYPED_FORMATS else None
+
+        # Row formats are written straight from the dicts; columnar formats
+        # go through Arrow's C++ writers when the rows convert cleanly.
+        # pandas is left for the parquet fallback.
+        if format == "json":
+            out.write_bytes(_dump_json(data, indent=True))
         elif format == "ndjson":
-            df.to_json(out, orient="records", lines=True)
+            out.write_bytes(b"".join(orjson.dumps(row) + b"\n" for row in data))
         elif format == "xlsx":
-            df.to_excel(out, index=False)
-        elif format == "parquet":
-            df.to_parquet(out, index=False)
+            _write_xlsx_rows(data, out)
+        elif not _write_arrow(table, format, out):
+            rows = data.to_pylist() if isinstance(data, pa.Table) else data
+            if format == "csv":
+                _write_csv_rows(rows, out)
+            else:
+                import pandas as pd
+
+                pd.DataFrame(rows).to_parquet(
+                    out, index=False, compression=_PARQUET_COMPRESSION
+                )
+
+        # csv/xlsx lose column types; a parquet copy written after them lets
+        # reloads skip re-parsing and re-inferring the file.
+        if format in ("csv", "xlsx") and table is not None:
+            _write_arrow(table, "parquet", sidecar)
+        _invalidate_caches()
 
     def get_synthetic_data(
         self, project_name: str, layer: str, table_name: str
     ) -> dict:
         table_path = self._table_path(project_name, layer, table_name)
-        for fmt in self._FORMATS:
-            candidate = table_path / f"synthetic_data.{fmt}"
-            if not candidate.exists():
-                continue
-            if fmt == "csv":
-                df = pd.read_csv(candidate)
-            elif fmt == "json":
-                df = pd.read_json(candidate, orient="records")
-            elif fmt == "ndjson":
-                df = pd.read_json(candidate, lines=True)
-            elif fmt == "xlsx":
-                df = pd.read_excel(candidate)
-            elif fmt == "parquet":
-                df = pd.read_parquet(candidate)
-            data = df.to_dict(orient="records")
-            return {"data": data, "format": fmt, "row_count": len(data)}
+        saved_fmt, path, fmt, st = self._find_synthetic(table_path)
+        data = _read_synthetic_cached(str(path), fmt, st.st_mtime_ns, st.st_size)
+        return {"data": data, "format": saved_fmt, "row_count": len(data)}
 
-        raise FileNotFoundError("No synthetic data found for this table")
+    def get_synthetic_file(
+        self, project_name: str, layer: str, table_name: str
+    ) -> Path | None:
+        """Path of the synthetic data for DuckDB to scan directly.
+
+        Only csv and parquet (including the parquet copy of csv/xlsx data)
+        are scanned in place. None otherwise; use get_synthetic_table then.
+        DuckDB's JSON reader would turn date-like strings into DATE columns,
+        and xlsx needs an extension.
+        """
+        table_path = self._table_path(project_name, layer, table_name)
+        _, path, fmt, _ = self._find_synthetic(table_path)
+        return path if fmt in ("csv", "parquet") else None
+
+    def get_synthetic_table(
+        self, project_name: str, layer: str, table_name: str
+    ) -> pa.Table | list[dict]:
+        """Synthetic data as an Arrow table, for handing to DuckDB.
+
+        For the formats get_synthetic_file does not return (json, ndjson,
+        xlsx). Rows are converted to Arrow; if that fails they are returned
+        as-is.
+        """
+        table_path = self._table_path(project_name, layer, table_name)
+        _, path, fmt, st = self._find_synthetic(table_path)
+        table = _read_synthetic_table_cached(str(path), fmt, st.st_mtime_ns, st.st_size)
+        if table is None:
+            return _read_synthetic_cached(str(path), fmt, st.st_mtime_ns, st.st_size)
+        return table
 
     # ----------------------------------------------------- validation results
 
@@ -197,9 +444,8 @@ class ProjectManager:
         self, project_name: str, layer: str, table_name: str, results: dict
     ) -> None:
         table_path = self._table_path(project_name, layer, table_name)
-        (table_path / "validation_results.json").write_text(
-            json.dumps(results, indent=2)
-        )
+        (table_path / "validation_results.json").write_bytes(_dump_json(results))
+        _invalidate_caches()
 
     def get_validation_results(
         self, project_name: str, layer: str, table_name: str
@@ -208,4 +454,14 @@ class ProjectManager:
         results_file = table_path / "validation_results.json"
         if not results_file.exists():
             raise FileNotFoundError("Validation has not been run for this table")
-        return json.loads(results_file.read_text())
+        return _read_json(results_file)
+
+
+@lru_cache(maxsize=None)
+def _project_manager_for(projects_dir: str) -> ProjectManager:
+    return ProjectManager(projects_dir)
+
+
+def get_project_manager() -> ProjectManager:
+    """Shared ProjectManager for the current PROJECTS_DIR."""
+    return _project_manager_for(os.getenv("PROJECTS_DIR", "./projects"))
@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+import pyarrow as pa
+
+
+def rows_to_arrow(rows: list[dict]) -> pa.Table | None:
+    """Arrow table over the union of keys in rows.
+
+    Returns None for empty input or when a column mixes value types Arrow
+    cannot unify (e.g. ints and strings in LLM-generated rows), so callers
+    can fall back to pandas.
+    """
+    if not rows:
+        return None
+    try:
+        return pa.Table.from_struct_array(pa.array(rows))
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return None
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.llm.base import _ROW_CACHE, _ROW_CACHE_LOCK
+from app.services.llm.factory import _build_provider
+
+
+@pytest.fixture(scope="session")
+def client():
+    # One ASGI lifespan for the whole run. Services read PROJECTS_DIR and
+    # LLM_PROVIDER per request, so tests still isolate them with monkeypatch.
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(autouse=True)
+def _fresh_llm_state():
+    # Providers and generated rows are cached per process; drop them after
+    # each test so monkeypatched env or provider methods never leak.
+    yield
+    _build_provider.cache_clear()
+    with _ROW_CACHE_LOCK:
+        _ROW_CACHE.clear()
@@ -5,7 +5,7 @@ from app.models.spec import (
     ColumnTransformations,
     RegexTransform,
 )
-from app.services.compiler import TransformCompiler
+from app.services.compiler import TransformCompiler, compile_table_cached
 
 
 # ------------------------------------------------------------------ helpers
@@ -15,11 +15,12 @@ def _col(name="col_a", data_type="string", **kwargs) -> Column:
 
 
 def _table_spec(cols: list[Column], name="customers", layer="bronze") -> dict:
+    columns = [c.model_dump(mode="json") for c in cols]
     return {
         "project": {"name": "proj"},
         "table": {"name": name, "layer": layer},
-        "columns": [c.model_dump(mode="json") for c in cols],
-        "notes": {c.name: c.notes for c in cols},
+        "columns": columns,
+        "notes": {c["name"]: c["notes"] for c in columns},
     }
 
 
@@ -75,6 +76,23 @@ def test_transform_stacking_order():
     )
 
 
+def test_pyspark_chaining():
+    compiler = TransformCompiler()
+    col = _col(
+        name="name",
+        transformations=ColumnTransformations(
+            trim=True,
+            case_normalization="upper",
+            null_strategy="replace",
+            null_replacement="N/A",
+        ),
+    )
+    result = compiler.compile_column(col, "pyspark", "pyspark")
+    assert result["expression"] == (
+        "F.coalesce(F.upper(F.trim(F.col('name'))), F.lit('N/A'))"
+    )
+
+
 def test_custom_expression_bypass():
     compiler = TransformCompiler()
     col = _col(
@@ -88,6 +106,16 @@ def test_custom_expression_bypass():
     assert "TRIM" not in result["expression"]
 
 
+def test_pass_through_column():
+    compiler = TransformCompiler()
+    col = _col("id", "integer")
+    assert col.transformations.is_identity()
+    assert compiler.compile_column(col, "sql", "ansi")["expression"] == "id"
+    result = compiler.compile_column(col, "pyspark", "pyspark")
+    assert result["expression"] == "F.col('id')"
+    assert not ColumnTransformations(trim=True).is_identity()
+
+
 def test_full_sql_cte_structure():
     compiler = TransformCompiler()
     cols = [
@@ -128,3 +156,63 @@ def test_dbt_output():
     assert "source(" in result["model_sql"], "dbt source() macro missing"
     assert "id" in result["schema_yml"], "Column 'id' missing from schema.yml"
     assert "not_null" in result["schema_yml"], "not_null test missing from schema.yml"
+
+
+def test_dbt_description_escaped():
+    compiler = TransformCompiler()
+    spec = _table_spec([_col("name", "string")])
+    spec["notes"] = {"name": 'Full "legal" name'}
+    result = compiler.compile_table_dbt(spec, "ansi", {"name": "proj"})
+    assert 'description: "Full \\"legal\\" name"' in result["schema_yml"]
+
+
+def test_compile_table_all_matches_individual_targets():
+    compiler = TransformCompiler()
+    cols = [
+        _col("id", "integer", nullable=False),
+        _col("name", "string", transformations=ColumnTransformations(trim=True)),
+    ]
+    spec = _table_spec(cols)
+    config = {"catalog": "", "name": "proj"}
+    result = compiler.compile_table_all(spec, "spark_sql", config)
+    assert result["sql"] == compiler.compile_table_sql(spec, "spark_sql", config)
+    assert result["pyspark"] == compiler.compile_table_pyspark(spec, config)
+    assert result["dbt"] == compiler.compile_table_dbt(spec, "spark_sql", config)
+
+
+def test_compile_table_cached():
+    compiler = TransformCompiler()
+    cols = [_col("name", "string", transformations=ColumnTransformations(trim=True))]
+    spec = _table_spec(cols)
+    config = {"catalog": "cat", "name": "proj"}
+    result = compile_table_cached("all", spec, "ansi", config)
+    assert result["sql"] == compiler.compile_table_sql(spec, "ansi", config)
+    assert result["dbt"] == compiler.compile_table_dbt(spec, "ansi", config)
+    assert result["pyspark"] == compiler.compile_table_pyspark(spec, config)
+    assert compile_table_cached("sql", spec, "ansi", config) == result["sql"]
+    assert compile_table_cached("all", spec, "ansi", config) is result
+
+    spec["columns"][0]["transformations"]["trim"] = False
+    assert "TRIM" not in compile_table_cached("sql", spec, "ansi", config)["sql"]
+
+
+def test_compile_table_cached_reuses_unchanged_column_fragments():
+    cols = [
+        _col("name", "string", transformations=ColumnTransformations(trim=True)),
+        _col("city", "string", transformations=ColumnTransformations(trim=True)),
+    ]
+    spec = _table_spec(cols)
+    config = {"catalog": "", "name": "proj"}
+    first = compile_table_cached("sql", spec, "ansi", config)["columns"]
+
+    spec["columns"][0]["transformations"]["trim"] = False
+    second = compile_table_cached("sql", spec, "ansi", config)["columns"]
+    assert second[0]["expression"] == "name"
+    assert first[0]["expression"] == "TRIM(name)"
+    assert second[1] is first[1]
+
+    spec["columns"][1]["transformations"]["case_normalization"] = "upper"
+    third = compile_table_cached("sql", spec, "ansi", config)["columns"]
+    assert third[0] is second[0]
+    assert third[1] is not second[1]
+    assert "UPPER" in third[1]["expression"]
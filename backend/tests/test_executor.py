@@ -1,12 +1,22 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
 from app.models.spec import Column, ColumnTransformations, RegexTransform
-from app.services.executor import DuckDBExecutor
+from app.services.executor import DuckDBExecutor, get_executor
+
+
+@pytest.fixture(scope="module")
+def executor() -> DuckDBExecutor:
+    return get_executor()
 
 
 # ------------------------------------------------------------ execute_sql
 
 
-def test_basic_execution():
-    executor = DuckDBExecutor()
+def test_basic_execution(executor):
     data = [
         {"customer_name": f"  user_{i}  " if i % 2 == 0 else f"  User_{i}  "}
         for i in range(10)
@@ -24,8 +34,7 @@ def test_basic_execution():
         assert val == val.upper(), f"Not uppercase: '{val}'"
 
 
-def test_null_handling():
-    executor = DuckDBExecutor()
+def test_null_handling(executor):
     data = [
         {"email": None if i in (2, 5, 8) else f"user{i}@example.com"}
         for i in range(10)
@@ -40,8 +49,66 @@ def test_null_handling():
     assert all(r["email"] is not None for r in result["rows"])
 
 
-def test_execute_returns_error_dict():
-    executor = DuckDBExecutor()
+def test_execute_mixed_type_column(executor):
+    data = [{"phone": 5551234}, {"phone": "555-1234"}, {"phone": None}]
+    result = executor.execute_sql(
+        "SELECT phone FROM customers", data, "customers"
+    )
+    assert result["success"] is True
+    assert result["row_count"] == 3
+
+
+def test_execute_isolates_requests(executor):
+    executor.execute_sql(
+        "CREATE TABLE leftover AS SELECT * FROM customers",
+        [{"id": 1}],
+        "customers",
+    )
+    result = executor.execute_sql("SELECT * FROM leftover", [], "customers")
+    assert result["success"] is False
+    result = executor.execute_sql("SELECT * FROM customers", [], "customers")
+    assert result["success"] is False
+
+
+def test_execute_statements_do_not_leak_between_requests(executor):
+    threads = executor.execute_sql(
+        "SELECT current_setting('threads') AS n", [], "customers"
+    )["rows"]
+    for query in (
+        "BEGIN; CREATE TABLE leftover AS SELECT 42 AS x; COMMIT",
+        "SET threads = 1",
+    ):
+        assert executor.execute_sql(query, [{"id": 1}], "customers")["success"]
+
+    assert executor.execute_sql("SELECT * FROM leftover", [], "customers")[
+        "success"
+    ] is False
+    assert executor.execute_sql(
+        "SELECT current_setting('threads') AS n", [], "customers"
+    )["rows"] == threads
+
+
+def test_execute_allows_pragma_and_call(executor):
+    result = executor.execute_sql(
+        "PRAGMA table_info('customers')", [{"id": 1}], "customers"
+    )
+    assert result["success"], result["error"]
+    assert result["rows"][0]["name"] == "id"
+    assert executor.execute_sql("CALL pragma_version()", [], "customers")["success"]
+
+
+def test_execute_concurrent_ddl_with_same_name(executor):
+    query = "CREATE TABLE t AS SELECT * FROM customers; SELECT * FROM t"
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        results = list(pool.map(
+            lambda i: executor.execute_sql(query, [{"id": i}], "customers"),
+            range(2),
+        ))
+    assert [r["error"] for r in results] == ["", ""]
+    assert sorted(r["rows"][0]["id"] for r in results) == [0, 1]
+
+
+def test_execute_returns_error_dict(executor):
     result = executor.execute_sql(
         "SELECT * FROM nonexistent_table_xyz", [], "customers"
     )
@@ -52,16 +119,14 @@ def test_execute_returns_error_dict():
 # ------------------------------------------------------- generate_assertions
 
 
-def test_generate_assertions_not_nullable():
-    executor = DuckDBExecutor()
+def test_generate_assertions_not_nullable(executor):
     col = Column(name="id", data_type="integer", nullable=False)
     assertions = executor.generate_assertions(col)
     types = [a["type"] for a in assertions]
     assert "not_null" in types
 
 
-def test_generate_assertions_with_regex():
-    executor = DuckDBExecutor()
+def test_generate_assertions_with_regex(executor):
     col = Column(
         name="phone",
         data_type="string",
@@ -77,8 +142,7 @@ def test_generate_assertions_with_regex():
 # --------------------------------------------------------- validate_table
 
 
-def test_validate_table_full():
-    executor = DuckDBExecutor()
+def test_validate_table_full(executor):
 
     table_spec = {
         "project": {"name": "test_proj"},
@@ -117,3 +181,59 @@ def test_validate_table_full():
         a for a in id_assertions if a["type"] == "row_count_gte"
     )
     assert row_count_result["passed"] is True
+
+
+def test_validate_table_multi_statement_sql(executor):
+    table_spec = {
+        "project": {"name": "test_proj"},
+        "table": {"name": "test_table", "layer": "bronze"},
+        "columns": [
+            Column(name="id", data_type="integer", nullable=False).model_dump(
+                mode="json"
+            ),
+        ],
+        "notes": {},
+    }
+    data = [{"id": i} for i in range(5)]
+
+    result = executor.validate_table(
+        table_spec,
+        "CREATE TEMP TABLE staged AS SELECT * FROM test_table WHERE id > 1;\n"
+        "SELECT id FROM staged;",
+        data,
+    )
+
+    assert result["execution"]["success"], result["execution"]["error"]
+    assert result["execution"]["row_count"] == 3
+    assert result["passed"] is True
+
+
+def test_validate_table_scans_saved_files(executor, tmp_path):
+    table_spec = {
+        "project": {"name": "test_proj"},
+        "table": {"name": "test_table", "layer": "bronze"},
+        "columns": [
+            Column(name="id", data_type="integer", nullable=False).model_dump(
+                mode="json"
+            ),
+        ],
+        "notes": {},
+    }
+    csv_file = tmp_path / "synthetic_data.csv"
+    csv_file.write_text("id,signup\n1,2024-01-15\n,2024-01-16\n3,2024-01-17\n")
+    parquet_file = tmp_path / "synthetic_data.parquet"
+    pq.write_table(pa.table({"id": [1, 2]}), parquet_file)
+
+    # Date-like csv text stays VARCHAR, so string functions bind.
+    result = executor.validate_table(
+        table_spec, "SELECT id, TRIM(signup) AS signup FROM test_table", csv_file
+    )
+    assert result["execution"]["success"], result["execution"]["error"]
+    assert result["execution"]["row_count"] == 3
+    assert result["columns"]["id"]["passed"] is False
+
+    result = executor.validate_table(
+        table_spec, "SELECT id FROM test_table", parquet_file
+    )
+    assert result["execution"]["row_count"] == 2
+    assert result["passed"] is True
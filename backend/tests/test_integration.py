@@ -8,12 +8,13 @@ here (data is seeded directly via ProjectManager in Step 5).
 """
 from __future__ import annotations
 
+import asyncio
 import json
+import os
 
+import httpx
 import pytest
-from fastapi.testclient import TestClient
 
-from app.main import app
 from app.services.project_manager import ProjectManager
 
 # ---------------------------------------------------------------------------
@@ -83,17 +84,34 @@ _TRANSFORMS = [
 ]
 
 
+_TABLE_FILES = {"schema.json", "transformations.json", "column_notes.json"}
+
+
+def _listdir(path) -> set[str]:
+    """Names in a directory, from one scandir instead of a stat per file."""
+    with os.scandir(path) as it:
+        return {entry.name for entry in it}
+
+
 def _make_synthetic_rows() -> list[dict]:
     """20 rows: 5 names with spaces, 4 phones with dashes, 3 None emails."""
+    base = {
+        "customer_id":   0,
+        "customer_name": "",
+        "phone":         "98-765-4321",
+        "email":         None,
+        "signup_date":   "2024-01-15",
+    }
     rows = []
     for i in range(1, 21):
-        rows.append({
-            "customer_id":   i,
-            "customer_name": f"  Customer {i}  " if i <= 5 else f"Customer {i}",
-            "phone":         "98-765-4321" if i <= 4 else f"9876543{i:02d}",
-            "email":         None if i <= 3 else f"customer{i}@example.com",
-            "signup_date":   "2024-01-15",
-        })
+        row = base.copy()
+        row["customer_id"] = i
+        row["customer_name"] = f"  Customer {i}  " if i <= 5 else f"Customer {i}"
+        if i > 4:
+            row["phone"] = f"9876543{i:02d}"
+        if i > 3:
+            row["email"] = f"customer{i}@example.com"
+        rows.append(row)
     return rows
 
 
@@ -101,125 +119,189 @@ def _make_synthetic_rows() -> list[dict]:
 # Integration test
 # ---------------------------------------------------------------------------
 
-def test_full_pipeline(tmp_path, monkeypatch):
+@pytest.mark.parametrize("fmt", ["csv", "json", "ndjson", "parquet"])
+def test_full_pipeline(client, tmp_path, monkeypatch, fmt):
     # Isolate project storage to a fresh tmp directory for this test run.
     monkeypatch.setenv("PROJECTS_DIR", str(tmp_path))
     # Keep the LLM provider as phi3 (lazy); it is never loaded in this test.
     monkeypatch.setenv("LLM_PROVIDER", "phi3")
 
-    with TestClient(app) as client:
-
-        # ------------------------------------------------------------------ #
-        # Step 1 — Create project                                             #
-        # ------------------------------------------------------------------ #
-        r = client.post("/api/projects/", json={
-            "name":         "test_bank",
-            "platform":     "databricks",
-            "dialect":      "spark_sql",
-            "catalog":      "hive_metastore",
-            "schema_layer": "bronze",
-        })
-        assert r.status_code == 201, r.text
-
-        tforge = tmp_path / "test_bank.tforge"
-        assert tforge.is_dir(), ".tforge folder must exist on disk"
-
-        # ------------------------------------------------------------------ #
-        # Step 2 — Create table                                               #
-        # ------------------------------------------------------------------ #
-        r = client.post("/api/projects/test_bank/tables", json={
-            "name":    "customers",
-            "layer":   "bronze",
-            "columns": _COLUMNS,
-        })
-        assert r.status_code == 201, r.text
-
-        table_path = tforge / "bronze" / "customers"
-        assert (table_path / "schema.json").exists(),          "schema.json must exist"
-        assert (table_path / "transformations.json").exists(), "transformations.json must exist"
-        assert (table_path / "column_notes.json").exists(),    "column_notes.json must exist"
-
-        # ------------------------------------------------------------------ #
-        # Step 3 — Update transformations                                     #
-        # ------------------------------------------------------------------ #
-        r = client.put(
-            "/api/projects/test_bank/tables/bronze/customers/transformations",
-            json={"columns": _TRANSFORMS},
-        )
-        assert r.status_code == 200, r.text
-
-        # Verify disk: read transformations.json directly
-        saved = json.loads((table_path / "transformations.json").read_text())
-        customer_name_col = next(c for c in saved if c["name"] == "customer_name")
-        assert customer_name_col["transformations"]["trim"] is True, \
-            "customer_name trim must be persisted as true"
-
-        # ------------------------------------------------------------------ #
-        # Step 4 — Compile all formats                                        #
-        # ------------------------------------------------------------------ #
-        r = client.post("/api/compile/all", json={
-            "project_name": "test_bank",
-            "layer":        "bronze",
-            "table_name":   "customers",
-            "target":       "all",
-            "dialect":      "spark_sql",
-        })
-        assert r.status_code == 200, r.text
-
-        compiled = r.json()
-        assert "sql"    in compiled
-        assert "pyspark" in compiled
-        assert "dbt"    in compiled
-
-        sql_output     = compiled["sql"]["sql"]
-        pyspark_output = compiled["pyspark"]["code"]
-        dbt_output     = compiled["dbt"]["model_sql"]
-
-        assert "WITH cleaned AS" in sql_output,        "SQL must open with CTE"
-        assert "LOWER"           in sql_output,        "LOWER() must appear for customer_name"
-        assert "def clean_customers" in pyspark_output, "PySpark must define clean_customers"
-        assert "source("         in dbt_output,        "dbt must reference source()"
-
-        # Keep the SQL for step 6
-        compiled_sql = sql_output
-
-        # ------------------------------------------------------------------ #
-        # Step 5 — Seed synthetic data directly via ProjectManager            #
-        # ------------------------------------------------------------------ #
-        pm = ProjectManager()
-        synthetic_rows = _make_synthetic_rows()
-        pm.save_synthetic_data("test_bank", "bronze", "customers", synthetic_rows, "csv")
-
-        assert (table_path / "synthetic_data.csv").exists(), \
-            "synthetic_data.csv must be written to disk"
-
-        # ------------------------------------------------------------------ #
-        # Step 6 — Run validation (real DuckDB, real data)                    #
-        # ------------------------------------------------------------------ #
-        r = client.post("/api/execute/validate", json={
-            "project_name": "test_bank",
-            "layer":        "bronze",
-            "table_name":   "customers",
-            "compiled_sql": compiled_sql,
-        })
-        assert r.status_code == 200, r.text
-
-        report = r.json()
-        assert "passed"      in report,              "report must have 'passed' key"
-        assert "columns"     in report,              "report must have 'columns' key"
-        assert "customer_id" in report["columns"],   "columns must include customer_id"
-
-        assert (table_path / "validation_results.json").exists(), \
-            "validation_results.json must be persisted"
-
-        # ------------------------------------------------------------------ #
-        # Step 7 — Verify complete folder structure on disk                   #
-        # ------------------------------------------------------------------ #
-        assert (tforge / "project.json").exists()
-        assert (tforge / "bronze" / "customers" / "schema.json").exists()
-        assert (tforge / "bronze" / "customers" / "transformations.json").exists()
-        assert (tforge / "bronze" / "customers" / "column_notes.json").exists()
-        assert (tforge / "bronze" / "customers" / "synthetic_data.csv").exists()
-        assert (tforge / "bronze" / "customers" / "validation_results.json").exists()
+    # ------------------------------------------------------------------ #
+    # Step 1 — Create project                                             #
+    # ------------------------------------------------------------------ #
+    r = client.post("/api/projects/", json={
+        "name":         "test_bank",
+        "platform":     "databricks",
+        "dialect":      "spark_sql",
+        "catalog":      "hive_metastore",
+        "schema_layer": "bronze",
+    })
+    assert r.status_code == 201, r.text
+
+    tforge = tmp_path / "test_bank.tforge"
+    assert tforge.is_dir(), ".tforge folder must exist on disk"
+
+    # ------------------------------------------------------------------ #
+    # Step 2 — Create table                                               #
+    # ------------------------------------------------------------------ #
+    r = client.post("/api/projects/test_bank/tables", json={
+        "name":    "customers",
+        "layer":   "bronze",
+        "columns": _COLUMNS,
+    })
+    assert r.status_code == 201, r.text
+
+    table_path = tforge / "bronze" / "customers"
+    missing = _TABLE_FILES - _listdir(table_path)
+    assert not missing, f"table files must exist, missing: {missing}"
+
+    # ------------------------------------------------------------------ #
+    # Step 3 — Update transformations                                     #
+    # ------------------------------------------------------------------ #
+    r = client.put(
+        "/api/projects/test_bank/tables/bronze/customers/transformations",
+        json={"columns": _TRANSFORMS},
+    )
+    assert r.status_code == 200, r.text
+
+    # Verify disk: read transformations.json directly
+    saved = json.loads((table_path / "transformations.json").read_text())
+    customer_name_col = next(c for c in saved if c["name"] == "customer_name")
+    assert customer_name_col["transformations"]["trim"] is True, \
+        "customer_name trim must be persisted as true"
+
+    # ------------------------------------------------------------------ #
+    # Step 4 — Compile all formats                                        #
+    # ------------------------------------------------------------------ #
+    r = client.post("/api/compile/all", json={
+        "project_name": "test_bank",
+        "layer":        "bronze",
+        "table_name":   "customers",
+        "target":       "all",
+        "dialect":      "spark_sql",
+    })
+    assert r.status_code == 200, r.text
+
+    compiled = r.json()
+    assert "sql"    in compiled
+    assert "pyspark" in compiled
+    assert "dbt"    in compiled
+
+    sql_output     = compiled["sql"]["sql"]
+    pyspark_output = compiled["pyspark"]["code"]
+    dbt_output     = compiled["dbt"]["model_sql"]
+
+    assert "WITH cleaned AS" in sql_output,        "SQL must open with CTE"
+    assert "LOWER"           in sql_output,        "LOWER() must appear for customer_name"
+    assert "def clean_customers" in pyspark_output, "PySpark must define clean_customers"
+    assert "source("         in dbt_output,        "dbt must reference source()"
+
+    # Keep the SQL for step 6
+    compiled_sql = sql_output
+
+    # ------------------------------------------------------------------ #
+    # Step 5 — Seed synthetic data directly via ProjectManager            #
+    # ------------------------------------------------------------------ #
+    pm = ProjectManager()
+    synthetic_rows = _make_synthetic_rows()
+    pm.save_synthetic_data("test_bank", "bronze", "customers", synthetic_rows, fmt)
+
+    assert (table_path / f"synthetic_data.{fmt}").exists(), \
+        f"synthetic_data.{fmt} must be written to disk"
+
+    # ------------------------------------------------------------------ #
+    # Step 6 — Run validation (real DuckDB, real data)                    #
+    # ------------------------------------------------------------------ #
+    r = client.post("/api/execute/validate", json={
+        "project_name": "test_bank",
+        "layer":        "bronze",
+        "table_name":   "customers",
+        "compiled_sql": compiled_sql,
+    })
+    assert r.status_code == 200, r.text
+
+    report = r.json()
+    assert "passed"      in report,              "report must have 'passed' key"
+    assert "columns"     in report,              "report must have 'columns' key"
+    assert "customer_id" in report["columns"],   "columns must include customer_id"
+
+    assert (table_path / "validation_results.json").exists(), \
+        "validation_results.json must be persisted"
+
+    # signup_date holds date-like text; string transforms must still bind
+    # whichever format it was saved in.
+    r = client.post("/api/execute/validate", json={
+        "project_name": "test_bank",
+        "layer":        "bronze",
+        "table_name":   "customers",
+        "compiled_sql": "SELECT customer_id, TRIM(signup_date) AS signup_date FROM customers",
+    })
+    assert r.status_code == 200, r.text
+    assert r.json()["execution"]["success"], r.json()["execution"]["error"]
+
+    # ------------------------------------------------------------------ #
+    # Step 7 — Verify complete folder structure on disk                   #
+    # ------------------------------------------------------------------ #
+    assert "project.json" in _listdir(tforge)
+    expected = _TABLE_FILES | {f"synthetic_data.{fmt}", "validation_results.json"}
+    missing = expected - _listdir(table_path)
+    assert not missing, f"table folder is incomplete, missing: {missing}"
 
     print("✅ PHASE 1 COMPLETE — DataForge Studio backend working end to end")
+
+
+def test_concurrent_compile_and_validate(client, tmp_path, monkeypatch):
+    """Independent requests issued together through the ASGI app agree
+    with the sequential results (sync handlers share the threadpool)."""
+    monkeypatch.setenv("PROJECTS_DIR", str(tmp_path))
+
+    client.post("/api/projects/", json={
+        "name": "test_bank", "platform": "databricks", "dialect": "spark_sql",
+    })
+    client.post("/api/projects/test_bank/tables", json={
+        "name": "customers", "layer": "bronze", "columns": _COLUMNS,
+    })
+    client.put(
+        "/api/projects/test_bank/tables/bronze/customers/transformations",
+        json={"columns": _TRANSFORMS},
+    )
+    ProjectManager().save_synthetic_data(
+        "test_bank", "bronze", "customers", _make_synthetic_rows(), "parquet"
+    )
+    compile_req = {
+        "project_name": "test_bank",
+        "layer":        "bronze",
+        "table_name":   "customers",
+        "target":       "all",
+        "dialect":      "spark_sql",
+    }
+    sql = client.post("/api/compile/sql", json=compile_req).json()["sql"]
+    # Queried by bare table name, which is how the executor registers data.
+    query = "SELECT customer_id, TRIM(customer_name) AS customer_name FROM customers"
+    validate_req = {
+        "project_name": "test_bank",
+        "layer":        "bronze",
+        "table_name":   "customers",
+        "compiled_sql": query,
+    }
+
+    async def run_together():
+        transport = httpx.ASGITransport(app=client.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+            return await asyncio.gather(
+                ac.post("/api/compile/sql", json=compile_req),
+                ac.post("/api/compile/pyspark", json=compile_req),
+                ac.post("/api/compile/dbt", json=compile_req),
+                *(ac.post("/api/execute/validate", json=validate_req) for _ in range(4)),
+            )
+
+    responses = asyncio.run(run_together())
+    assert all(r.status_code == 200 for r in responses), [r.text for r in responses]
+    sql_r, pyspark_r, dbt_r, *validations = responses
+    assert sql_r.json()["sql"] == sql
+    all_r = client.post("/api/compile/all", json=compile_req).json()
+    assert pyspark_r.json() == all_r["pyspark"]
+    assert dbt_r.json() == all_r["dbt"]
+    reports = [v.json() for v in validations]
+    assert all(r == reports[0] for r in reports)
+    assert reports[0]["execution"]["row_count"] == 20
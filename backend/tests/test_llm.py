@@ -1,8 +1,13 @@
 from __future__ import annotations
 
+import asyncio
+import json
+import sys
+
+import httpx
 import pytest
 
-from app.services.llm.base import PromptBuilderMixin
+from app.services.llm.base import PromptBuilderMixin, ProviderUnavailableError
 from app.services.llm.factory import get_llm_provider
 from app.services.llm.providers.ollama import OllamaProvider
 from app.services.llm.providers.openai_compat import OpenAICompatProvider
@@ -57,6 +62,13 @@ def test_parse_json_embedded_in_text():
     assert len(result) == 1
 
 
+def test_parse_json_nested_brackets_and_trailing_text():
+    builder = _Builder()
+    raw = 'Data: [{"tags": ["a]", "b"], "note": "say \\"[hi]\\""}] see [1]'
+    result = builder.parse_json_response(raw)
+    assert result == [{"tags": ["a]", "b"], "note": 'say "[hi]"'}]
+
+
 def test_parse_invalid_raises():
     builder = _Builder()
     with pytest.raises(ValueError) as exc_info:
@@ -64,6 +76,176 @@ def test_parse_invalid_raises():
     assert "LLM returned invalid JSON" in str(exc_info.value)
 
 
+# ---------------------------------------------------------------------------
+# ollama streaming
+# ---------------------------------------------------------------------------
+
+def _ollama_stream(monkeypatch, *lines: dict | str) -> None:
+    body = "\n".join(l if isinstance(l, str) else json.dumps(l) for l in lines)
+    monkeypatch.setattr(
+        "app.services.llm.providers.ollama.CLIENT",
+        httpx.Client(
+            transport=httpx.MockTransport(lambda r: httpx.Response(200, text=body))
+        ),
+    )
+
+
+def test_ollama_stream_error_is_raised(monkeypatch):
+    _ollama_stream(
+        monkeypatch,
+        {"response": "[", "done": False},
+        {"error": "model 'mistral' not found"},
+    )
+    with pytest.raises(RuntimeError, match="model 'mistral' not found"):
+        OllamaProvider().generate_synthetic_data([], {}, 1)
+
+
+def test_ollama_stream_stops_at_done(monkeypatch):
+    _ollama_stream(
+        monkeypatch,
+        {"response": '[{"id": 1}', "done": False},
+        {"response": "]", "done": True},
+        "not json",
+    )
+    assert OllamaProvider().generate_synthetic_data([], {}, 1) == [{"id": 1}]
+
+
+# ---------------------------------------------------------------------------
+# batch generation
+# ---------------------------------------------------------------------------
+
+def test_ollama_batch_issues_one_request_per_chunk(monkeypatch):
+    prompts: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        prompt = json.loads(request.content)["prompt"]
+        prompts.append(prompt)
+        count = int(prompt.split()[2])
+        text = json.dumps([{"id": i} for i in range(count)])
+        # Ollama streams NDJSON pieces of the generated text.
+        half = len(text) // 2
+        body = "\n".join(
+            json.dumps({"response": piece, "done": done})
+            for piece, done in ((text[:half], False), (text[half:], True))
+        )
+        return httpx.Response(200, text=body)
+
+    monkeypatch.setattr(
+        "app.services.llm.base.async_client",
+        lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+    provider = OllamaProvider()
+    schema = [{"name": "id", "data_type": "int", "nullable": False}]
+    batches = provider.generate_synthetic_data_batch(schema, {}, [3, 2])
+    assert [len(b) for b in batches] == [3, 2]
+    assert len(prompts) == 2
+    # Each chunk is told which rows it covers, so ids do not restart.
+    assert len(set(prompts)) == 2
+    assert any("rows 4 to 5" in p for p in prompts)
+
+
+def test_batch_caps_generations_in_flight(monkeypatch):
+    in_flight = 0
+    peak = 0
+
+    async def fake_agenerate(self, schema, notes, n, client=None, row_offset=None):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return [{"id": row_offset + i} for i in range(n)]
+
+    monkeypatch.setattr(OllamaProvider, "agenerate_synthetic_data", fake_agenerate)
+    monkeypatch.setenv("LLM_MAX_CONCURRENCY", "3")
+    batches = OllamaProvider().generate_synthetic_data_batch([], {}, [2] * 10)
+    assert peak == 3
+    assert [row["id"] for batch in batches for row in batch] == list(range(20))
+
+
+def test_generate_rows_splits_into_chunks(monkeypatch):
+    calls: list[list[int]] = []
+
+    def fake_batch(self, schema, notes, row_counts):
+        calls.append(row_counts)
+        return [[{"id": i} for i in range(n)] for n in row_counts]
+
+    monkeypatch.setattr(OllamaProvider, "generate_synthetic_data_batch", fake_batch)
+    rows = OllamaProvider().generate_rows([], {}, 120)
+    assert calls == [[50, 50, 20]]
+    assert len(rows) == 120
+
+
+def test_generate_rows_zero_skips_provider(monkeypatch):
+    def boom(*args, **kwargs):
+        raise AssertionError("provider should not be called")
+
+    monkeypatch.setattr(OllamaProvider, "generate_synthetic_data", boom)
+    assert OllamaProvider().generate_rows([], {}, 0) == []
+
+
+def test_generate_rows_cache_is_opt_in(monkeypatch):
+    calls: list[int] = []
+
+    def fake_generate(self, schema, notes, row_count):
+        calls.append(row_count)
+        return [{"id": len(calls)}]
+
+    monkeypatch.setattr(OllamaProvider, "generate_synthetic_data", fake_generate)
+    schema = [{"name": "id", "data_type": "int", "nullable": False}]
+    provider = OllamaProvider(model="cache-test")
+
+    provider.generate_rows(schema, {}, 1)
+    provider.generate_rows(schema, {}, 1)
+    assert len(calls) == 2
+
+    monkeypatch.setenv("LLM_CACHE_SIZE", "8")
+    first = provider.generate_rows(schema, {"id": "sequential"}, 1)
+    assert provider.generate_rows(schema, {"id": "sequential"}, 1) == first
+    assert len(calls) == 3
+
+
+# ---------------------------------------------------------------------------
+# phi3
+# ---------------------------------------------------------------------------
+
+def test_phi3_failed_import_reports_unavailable(monkeypatch):
+    # Installed as far as find_spec can tell, but the import itself fails.
+    monkeypatch.setattr(
+        "app.services.llm.providers.phi3._transformers_installed", lambda: True
+    )
+    monkeypatch.setitem(sys.modules, "torch", None)
+    provider = Phi3Provider()
+    assert provider.is_available()
+
+    with pytest.raises(ProviderUnavailableError, match="unavailable"):
+        provider.generate_synthetic_data([], {}, 1)
+    assert not provider.is_available()
+    assert provider.get_provider_info()["status"] == "not_installed"
+
+
+def test_generate_data_returns_503_when_phi3_cannot_import(
+    client, tmp_path, monkeypatch
+):
+    monkeypatch.setenv("PROJECTS_DIR", str(tmp_path))
+    monkeypatch.setenv("LLM_PROVIDER", "phi3")
+    monkeypatch.setitem(sys.modules, "torch", None)
+    client.post("/api/projects/", json={
+        "name": "p", "platform": "databricks", "dialect": "spark_sql",
+        "catalog": "hive_metastore", "schema_layer": "bronze",
+    })
+    client.post("/api/projects/p/tables", json={
+        "name": "t", "layer": "bronze",
+        "columns": [{"name": "id", "data_type": "integer", "nullable": False}],
+    })
+
+    r = client.post("/api/llm/generate-data", json={
+        "project_name": "p", "layer": "bronze", "table_name": "t", "row_count": 1,
+    })
+    assert r.status_code == 503, r.text
+    assert "unavailable" in r.json()["detail"]
+
+
 # ---------------------------------------------------------------------------
 # factory
 # ---------------------------------------------------------------------------
@@ -86,6 +268,17 @@ def test_factory_returns_openai(monkeypatch):
     assert isinstance(provider, OpenAICompatProvider)
 
 
+def test_factory_reuses_provider_per_config(monkeypatch):
+    monkeypatch.setenv("LLM_PROVIDER", "ollama")
+    monkeypatch.setenv("OLLAMA_MODEL", "mistral")
+    first = get_llm_provider()
+    assert get_llm_provider() is first
+    monkeypatch.setenv("OLLAMA_MODEL", "llama3")
+    other = get_llm_provider()
+    assert other is not first
+    assert other.model == "llama3"
+
+
 def test_factory_unknown_raises(monkeypatch):
     monkeypatch.setenv("LLM_PROVIDER", "unknown_xyz")
     with pytest.raises(ValueError) as exc_info:
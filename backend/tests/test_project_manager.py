@@ -1,6 +1,11 @@
 import json
+import os
+import shutil
 
+import pyarrow as pa
+import pyarrow.parquet as pq
 import pytest
+from pydantic import ValidationError
 
 from app.models.requests import CreateProjectRequest, CreateTableRequest
 from app.models.spec import Column, ColumnTransformations
@@ -47,6 +52,16 @@ def test_duplicate_project(tmp_path, monkeypatch):
         pm.create_project(_proj_req())
 
 
+def test_list_projects_tracks_directory_changes(tmp_path, monkeypatch):
+    pm = _pm(tmp_path, monkeypatch)
+    pm.create_project(_proj_req("alpha"))
+    pm.create_project(_proj_req("beta"))
+    assert sorted(p["name"] for p in pm.list_projects()) == ["alpha", "beta"]
+
+    shutil.rmtree(tmp_path / "alpha.tforge")
+    assert [p["name"] for p in pm.list_projects()] == ["beta"]
+
+
 # ------------------------------------------------------------------- tables
 
 
@@ -62,12 +77,22 @@ def test_create_table(tmp_path, monkeypatch):
     assert (table_path / "column_notes.json").exists()
 
 
-def test_get_table_spec(tmp_path, monkeypatch):
-    pm = _pm(tmp_path, monkeypatch)
+@pytest.fixture(scope="module")
+def seeded_pm(tmp_path_factory) -> ProjectManager:
+    """Shared project for tests that only read: three tables over two layers.
+
+    Tests that write get their own tmp_path via _pm instead.
+    """
+    pm = ProjectManager(str(tmp_path_factory.mktemp("seeded")))
     pm.create_project(_proj_req())
-    pm.create_table("myproject", _table_req())
+    pm.create_table("myproject", _table_req("orders", "bronze"))
+    pm.create_table("myproject", _table_req("customers", "bronze"))
+    pm.create_table("myproject", _table_req("dim_date", "silver"))
+    return pm
 
-    spec = pm.get_table_spec("myproject", "bronze", "customers")
+
+def test_get_table_spec(seeded_pm):
+    spec = seeded_pm.get_table_spec("myproject", "bronze", "customers")
     assert "project" in spec
     assert "table" in spec
     assert "columns" in spec
@@ -97,15 +122,88 @@ def test_save_transformations(tmp_path, monkeypatch):
     assert raw[0]["transformations"]["trim"] is True
 
 
-def test_list_tables(tmp_path, monkeypatch):
+def test_save_transformations_accepts_models(tmp_path, monkeypatch):
     pm = _pm(tmp_path, monkeypatch)
     pm.create_project(_proj_req())
+    pm.create_table("myproject", _table_req())
+    models = [
+        Column(
+            name="id",
+            data_type="integer",
+            transformations=ColumnTransformations(trim=True),
+        ),
+    ]
+    path = tmp_path / "myproject.tforge" / "bronze" / "customers" / "transformations.json"
 
-    pm.create_table("myproject", _table_req("orders", "bronze"))
-    pm.create_table("myproject", _table_req("customers", "bronze"))
-    pm.create_table("myproject", _table_req("dim_date", "silver"))
+    pm.save_transformations("myproject", "bronze", "customers", models)
+    from_models = path.read_bytes()
+    pm.save_transformations(
+        "myproject", "bronze", "customers",
+        [m.model_dump(mode="json") for m in models],
+    )
+    assert from_models == path.read_bytes()
+
+
+def test_save_transformations_mixed_and_invalid(tmp_path, monkeypatch):
+    pm = _pm(tmp_path, monkeypatch)
+    pm.create_project(_proj_req())
+    pm.create_table("myproject", _table_req())
+    path = tmp_path / "myproject.tforge" / "bronze" / "customers" / "transformations.json"
+
+    pm.save_transformations(
+        "myproject", "bronze", "customers",
+        [
+            Column(name="id", data_type="integer"),
+            {"name": "name", "data_type": "string"},
+        ],
+    )
+    assert [c["name"] for c in json.loads(path.read_text())] == ["id", "name"]
+
+    before = path.read_bytes()
+    with pytest.raises(ValidationError):
+        pm.save_transformations(
+            "myproject", "bronze", "customers",
+            [Column(name="id", data_type="integer"), {"data_type": "string"}],
+        )
+    assert path.read_bytes() == before
+
+
+def test_get_table_spec_sees_saved_transformations(tmp_path, monkeypatch):
+    pm = _pm(tmp_path, monkeypatch)
+    pm.create_project(_proj_req())
+    pm.create_table("myproject", _table_req())
+    pm.get_table_spec("myproject", "bronze", "customers")
+
+    updated = [
+        Column(
+            name="id",
+            data_type="integer",
+            transformations=ColumnTransformations(trim=True),
+        ).model_dump(mode="json"),
+    ]
+    pm.save_transformations("myproject", "bronze", "customers", updated)
+
+    spec = pm.get_table_spec("myproject", "bronze", "customers")
+    assert len(spec["columns"]) == 1
+    assert spec["columns"][0]["transformations"]["trim"] is True
 
-    result = pm.list_tables("myproject")
+
+def test_get_table_spec_is_cached_until_files_change(tmp_path, monkeypatch):
+    pm = _pm(tmp_path, monkeypatch)
+    pm.create_project(_proj_req())
+    pm.create_table("myproject", _table_req())
+    first = pm.get_table_spec("myproject", "bronze", "customers")
+    assert pm.get_table_spec("myproject", "bronze", "customers") is first
+
+    # An edit made outside the API changes the size, so it misses the cache.
+    notes_file = tmp_path / "myproject.tforge" / "bronze" / "customers" / "column_notes.json"
+    notes_file.write_text(json.dumps({"id": "edited by hand"}))
+    spec = pm.get_table_spec("myproject", "bronze", "customers")
+    assert spec["notes"] == {"id": "edited by hand"}
+
+
+def test_list_tables(seeded_pm):
+    result = seeded_pm.list_tables("myproject")
     assert len(result["bronze"]) == 2
     assert len(result["silver"]) == 1
     assert result["gold"] == []
@@ -133,9 +231,92 @@ def test_save_and_get_synthetic_data_csv(tmp_path, monkeypatch):
     assert result["format"] == "csv"
 
 
+def test_csv_reload_uses_parquet_copy_until_csv_changes(tmp_path, monkeypatch):
+    pm = _setup(tmp_path, monkeypatch)
+    rows = [{"zip": "01234", "score": None}, {"zip": "98765", "score": 3}]
+    pm.save_synthetic_data("myproject", "bronze", "customers", rows, "csv")
+    table_path = tmp_path / "myproject.tforge" / "bronze" / "customers"
+    assert (table_path / "synthetic_data.cache.parquet").exists()
+
+    result = pm.get_synthetic_data("myproject", "bronze", "customers")
+    assert result["format"] == "csv"
+    assert result["data"] == rows
+
+    # A hand-edited csv is newer than its copy and is parsed again.
+    csv_file = table_path / "synthetic_data.csv"
+    csv_file.write_text("zip,score\n11111,1\n")
+    st = csv_file.stat()
+    os.utime(csv_file, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    result = pm.get_synthetic_data("myproject", "bronze", "customers")
+    assert result["data"] == [{"zip": 11111, "score": 1}]
+
+
+def test_json_table_keeps_date_text(tmp_path, monkeypatch):
+    pm = _setup(tmp_path, monkeypatch)
+    rows = [{"id": 1, "signup": "2024-01-15"}, {"id": 2, "signup": None}]
+    pm.save_synthetic_data("myproject", "bronze", "customers", rows, "json")
+
+    assert pm.get_synthetic_file("myproject", "bronze", "customers") is None
+    table = pm.get_synthetic_table("myproject", "bronze", "customers")
+    assert table.schema.field("signup").type == pa.string()
+    assert table.to_pylist() == rows
+
+
 def test_save_and_get_synthetic_data_json(tmp_path, monkeypatch):
     pm = _setup(tmp_path, monkeypatch)
     pm.save_synthetic_data("myproject", "bronze", "customers", _sample_data(), "json")
     result = pm.get_synthetic_data("myproject", "bronze", "customers")
     assert result["row_count"] == 10
     assert result["format"] == "json"
+
+
+def test_save_ndjson_and_mixed_type_csv(tmp_path, monkeypatch):
+    pm = _setup(tmp_path, monkeypatch)
+    pm.save_synthetic_data("myproject", "bronze", "customers", _sample_data(3), "ndjson")
+    result = pm.get_synthetic_data("myproject", "bronze", "customers")
+    assert result["row_count"] == 3
+    assert result["data"][2] == {"id": 2, "name": "user_2"}
+
+    rows = [{"id": 1}, {"id": "two", "extra": "x"}]
+    pm.save_synthetic_data("myproject", "bronze", "customers", rows, "csv")
+    out = tmp_path / "myproject.tforge" / "bronze" / "customers" / "synthetic_data.csv"
+    assert out.read_text().splitlines() == ["id,extra", "1,", "two,x"]
+
+
+def test_save_xlsx_streams_rows(tmp_path, monkeypatch):
+    pm = _setup(tmp_path, monkeypatch)
+    pm.save_synthetic_data("myproject", "bronze", "customers", _sample_data(4), "xlsx")
+    table_path = tmp_path / "myproject.tforge" / "bronze" / "customers"
+    (table_path / "synthetic_data.cache.parquet").unlink()
+    result = pm.get_synthetic_data("myproject", "bronze", "customers")
+    assert result["format"] == "xlsx"
+    assert result["data"] == _sample_data(4)
+
+
+def test_save_arrow_batch_as_csv_and_json(tmp_path, monkeypatch):
+    pm = _setup(tmp_path, monkeypatch)
+    table_path = tmp_path / "myproject.tforge" / "bronze" / "customers"
+    batch = pa.RecordBatch.from_pylist(_sample_data(5))
+
+    pm.save_synthetic_data("myproject", "bronze", "customers", batch, "csv")
+    result = pm.get_synthetic_data("myproject", "bronze", "customers")
+    assert result["data"] == _sample_data(5)
+
+    (table_path / "synthetic_data.csv").unlink()
+    pm.save_synthetic_data("myproject", "bronze", "customers", batch, "json")
+    result = pm.get_synthetic_data("myproject", "bronze", "customers")
+    assert result["format"] == "json"
+    assert result["data"] == _sample_data(5)
+
+
+def test_save_parquet_and_get_synthetic_table(tmp_path, monkeypatch):
+    pm = _setup(tmp_path, monkeypatch)
+    pm.save_synthetic_data("myproject", "bronze", "customers", _sample_data(), "parquet")
+    result = pm.get_synthetic_data("myproject", "bronze", "customers")
+    assert result["row_count"] == 10
+    assert result["format"] == "parquet"
+    table = pm.get_synthetic_table("myproject", "bronze", "customers")
+    assert table.num_rows == 10
+    assert table.column_names == ["id", "name"]
+    out = tmp_path / "myproject.tforge" / "bronze" / "customers" / "synthetic_data.parquet"
+    assert pq.ParquetFile(out).metadata.row_group(0).column(0).compression == "ZSTD"